@@ -0,0 +1,122 @@
+import argparse
+import json
+import pathlib
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from felis.grammars import arithmetic
+from felis.grammars import csv as csv_grammar
+from felis.grammars import json as json_grammar
+
+results_path = pathlib.Path(__file__).with_name("results.json")
+
+sizes = [1 << 12, 1 << 14, 1 << 16]
+
+repeats = 3
+
+tolerance = 0.8
+
+
+def json_corpus(generator: random.Random, size: int) -> str:
+    records: list[str] = []
+    length = 0
+    while length < size:
+        record = json.dumps(
+            {
+                "id": generator.randrange(1 << 32),
+                "name": "".join(generator.choices("abcdefghijklmnopqrstuvwxyz", k=generator.randrange(4, 12))),
+                "score": generator.random() * 100,
+                "active": generator.choice([True, False]),
+                "tags": [generator.choice(["felis", "catus", "lynx", "été"]) for _ in range(generator.randrange(4))],
+                "parent": None,
+            },
+        )
+        records.append(record)
+        length += len(record) + 2
+    return "[" + ",\n".join(records) + "]"
+
+
+def csv_corpus(generator: random.Random, size: int) -> str:
+    rows: list[str] = []
+    length = 0
+    while length < size:
+        name = "".join(generator.choices("abcdefghij", k=generator.randrange(3, 10)))
+        note = f'"{name}, ""quoted""\n{generator.randrange(1000)}"' if generator.randrange(5) == 0 else name.upper()
+        row = f"{generator.randrange(1 << 20)},{name},{generator.random():.6f},{note}\r\n"
+        rows.append(row)
+        length += len(row)
+    return "".join(rows)
+
+
+def arithmetic_corpus(generator: random.Random, size: int) -> str:
+    terms: list[str] = []
+    length = 0
+    while length < size:
+        term = f"({generator.randrange(1, 1000)}*{generator.randrange(1, 100)}-{generator.randrange(1, 1000)}/{generator.randrange(1, 10)})"
+        terms.append(term)
+        length += len(term) + 1
+    return "+".join(terms)
+
+
+grammars: dict[str, tuple[Callable[[random.Random, int], str], Callable[[str], object]]] = {
+    "json": (json_corpus, json_grammar.parse),
+    "csv": (csv_corpus, csv_grammar.parse),
+    "arithmetic": (arithmetic_corpus, arithmetic.parse),
+}
+
+
+def measure(parse: Callable[[str], object], corpus: str) -> dict[str, float]:
+    megabytes = len(corpus.encode()) / 1e6
+    seconds = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        if parse(corpus) is None:
+            message = "corpus did not parse"
+            raise ValueError(message)
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    parse(corpus)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"megabytes_per_second": round(megabytes / seconds, 3), "peak_kibibytes": round(peak / 1024, 1), "retained_kibibytes": round(retained / 1024, 1)}
+
+
+def machine() -> str:
+    return f"{platform.node()} {platform.machine()} {platform.python_implementation()} {platform.python_version()}"
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Benchmark the reference grammars on generated corpora.")
+    arguments.add_argument("--save", action="store_true", help="store these results as the baseline for this machine")
+    arguments.add_argument("--strict", action="store_true", help="exit with an error when a benchmark regresses against this machine's baseline")
+    options = arguments.parse_args()
+    baselines = json.loads(results_path.read_text(encoding="utf-8")) if results_path.exists() else {}
+    stored = baselines.get(machine(), {})
+    if not stored:
+        print(f"no stored results for {machine()}; run with --save to record a baseline here")
+    results: dict[str, dict[str, float]] = {}
+    regressed = False
+    print(f"{'benchmark':<20} {'MB/s':>8} {'stored':>8} {'peak KiB':>10} {'retained KiB':>13}")
+    for name, (corpus_of, parse) in grammars.items():
+        for size in sizes:
+            key = f"{name}/{size}"
+            results[key] = measure(parse, corpus_of(random.Random(size), size))
+            previous = stored.get(key, {}).get("megabytes_per_second")
+            flag = ""
+            if previous is not None and results[key]["megabytes_per_second"] < previous * tolerance:
+                flag = " regression"
+                regressed = True
+            result = results[key]
+            print(f"{key:<20} {result['megabytes_per_second']:>8} {previous or '-':>8} {result['peak_kibibytes']:>10} {result['retained_kibibytes']:>13}{flag}")
+    if options.save:
+        baselines[machine()] = results
+        results_path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    sys.exit(1 if regressed and options.strict and not options.save else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from felis.alternative import Alternative
 from felis.applicative import Applicative
 from felis.bool import Bool
+from felis.bytes_parser import BytesParser
 from felis.coroutine import Coroutine
 from felis.dict import Dict
 from felis.either import Either
@@ -27,11 +28,13 @@ from felis.parser import Parser
 from felis.predicate import Predicate
 from felis.semigroup import Semigroup
 from felis.state import ReversedState, State
+from felis.token_parser import TokenParser
 
 __all__ = [
     "Alternative",
     "Applicative",
     "Bool",
+    "BytesParser",
     "Coroutine",
     "Dict",
     "Either",
@@ -59,4 +62,5 @@ __all__ = [
     "ReversedState",
     "Semigroup",
     "State",
+    "TokenParser",
 ]
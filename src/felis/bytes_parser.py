@@ -0,0 +1,445 @@
+import struct
+from collections.abc import Buffer, Callable
+from typing import TYPE_CHECKING, Any, Final, Literal
+
+import felis.alternative
+import felis.applicative
+import felis.functor
+import felis.monad
+import felis.option
+import felis.semigroup
+from felis import function, state
+from felis.alternative import Alternative
+from felis.applicative import Applicative
+from felis.currying import curry
+from felis.functor import Functor
+from felis.monad import Monad
+from felis.monoid import Monoid
+from felis.option import Option
+from felis.predicate import Predicate
+from felis.semigroup import Semigroup
+
+__all__ = [
+    "BytesParser",
+    "Cursor",
+    "add_to",
+    "alternative",
+    "any",
+    "applicative",
+    "apply_to",
+    "bind_to",
+    "bracket",
+    "by_map",
+    "byte",
+    "compose_after",
+    "compose_before",
+    "discard_after",
+    "discard_before",
+    "end",
+    "functor",
+    "guard",
+    "join",
+    "length_prefixed",
+    "lift",
+    "literal",
+    "many",
+    "map_by",
+    "monad",
+    "monoid",
+    "neutral",
+    "option",
+    "parse_as",
+    "pure",
+    "satisfies",
+    "semigroup",
+    "separated_by",
+    "signed",
+    "some",
+    "structure",
+    "take",
+    "take_after",
+    "take_before",
+    "take_while",
+    "to_add",
+    "to_apply",
+    "to_bind",
+    "unsigned",
+    "when",
+]
+
+
+class Cursor:
+    __match_args__ = ("buffer", "offset")
+
+    def __init__(self, buffer: memoryview, offset: int):
+        self.buffer: Final = buffer
+        self.offset: Final = offset
+
+
+type BytesParser[T] = Callable[[Cursor], Option[tuple[T, Cursor]]]
+
+
+@curry
+def parse_as[T](data: Buffer, parser_value: BytesParser[T]) -> Option[T]:
+    return state.starting_with_run_t(felis.option.functor)(parser_value)(Cursor(memoryview(data).cast("B"), 0))
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def to_add[T](augend: BytesParser[T], addend: BytesParser[T]) -> BytesParser[T]: ...
+
+else:
+    to_add = felis.option.to_add_t(function.monad)
+
+
+# [T : *] -> Semigroup (BytesParser T)
+semigroup: Semigroup[BytesParser[Any]] = Semigroup(to_add)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def add_to[T](addend: BytesParser[T], augend: BytesParser[T]) -> BytesParser[T]: ...
+
+else:
+    add_to = felis.semigroup.add_to(semigroup)
+
+
+# [T : *] -> BytesParser T
+neutral: BytesParser[Any] = felis.option.neutral_t(function.monad)
+
+
+# [T : *] -> Monoid (BytesParser T)
+monoid = Monoid(semigroup, neutral)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def map_by[From, To](parser_value: BytesParser[From], function: Callable[[From], To]) -> BytesParser[To]: ...
+
+else:
+    map_by = state.map_by_t(felis.option.functor)
+
+
+# Functor BytesParser
+functor = Functor(map_by)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def by_map[From, To](function: Callable[[From], To], parser_value: BytesParser[From]) -> BytesParser[To]: ...
+
+else:
+    by_map = felis.functor.by_map(functor)
+
+
+if TYPE_CHECKING:
+
+    def pure[T](value: T, /) -> BytesParser[T]: ...
+
+else:
+    pure = state.pure_t(felis.option.applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def to_apply[From, To](parser_value: BytesParser[From], parser_function: BytesParser[Callable[[From], To]]) -> BytesParser[To]: ...
+
+else:
+    to_apply = state.to_apply_t(felis.option.monad)
+
+
+# Applicative BytesParser
+applicative = Applicative(functor, pure, to_apply)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def apply_to[From, To](parser_function: BytesParser[Callable[[From], To]], parser_value: BytesParser[From]) -> BytesParser[To]: ...
+
+else:
+    apply_to = felis.applicative.apply_to(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    @curry
+    def lift[First, Second, Result](
+        second: BytesParser[Second],
+        first: BytesParser[First],
+        function: Callable[[First], Callable[[Second], Result]],
+    ) -> BytesParser[Result]: ...
+
+else:
+    lift = felis.applicative.lift(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def take_after[First, Second](second: BytesParser[Second], first: BytesParser[First]) -> BytesParser[Second]: ...
+
+else:
+    take_after = felis.applicative.take_after(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def discard_before[First, Second](first: BytesParser[First], second: BytesParser[Second]) -> BytesParser[Second]: ...
+
+else:
+    discard_before = felis.applicative.discard_before(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def discard_after[First, Second](second: BytesParser[Second], first: BytesParser[First]) -> BytesParser[First]: ...
+
+else:
+    discard_after = felis.applicative.discard_after(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def take_before[First, Second](first: BytesParser[First], second: BytesParser[Second]) -> BytesParser[First]: ...
+
+else:
+    take_before = felis.applicative.take_before(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def when(parser_none: BytesParser[None], bool: bool) -> BytesParser[None]: ...
+
+else:
+    when = felis.applicative.when(applicative)
+
+
+# Alternative BytesParser
+alternative = Alternative(monoid, applicative)
+
+
+if TYPE_CHECKING:
+
+    def guard(bool: bool, /) -> BytesParser[None]: ...
+
+else:
+    guard = felis.alternative.guard(alternative)
+
+
+if TYPE_CHECKING:
+
+    def join[T](parser_value: BytesParser[BytesParser[T]], /) -> BytesParser[T]: ...
+
+else:
+    join = state.join_t(felis.option.monad)
+
+
+# Monad BytesParser
+monad = Monad(applicative, join)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def bind_to[From, To](parser_value: BytesParser[From], function: Callable[[From], BytesParser[To]]) -> BytesParser[To]: ...
+
+else:
+    bind_to = felis.monad.bind_to(monad)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def to_bind[From, To](function: Callable[[From], BytesParser[To]], parser_value: BytesParser[From]) -> BytesParser[To]: ...
+
+else:
+    to_bind = felis.monad.to_bind(monad)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    @curry
+    def compose_after[From, Intermediate, To](
+        value: From,
+        second: Callable[[Intermediate], BytesParser[To]],
+        first: Callable[[From], BytesParser[Intermediate]],
+    ) -> BytesParser[To]: ...
+
+else:
+    compose_after = felis.monad.compose_after(monad)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    @curry
+    def compose_before[From, Intermediate, To](
+        value: From,
+        first: Callable[[From], BytesParser[Intermediate]],
+        second: Callable[[Intermediate], BytesParser[To]],
+    ) -> BytesParser[To]: ...
+
+else:
+    compose_before = felis.monad.compose_before(monad)
+
+
+def end(cursor: Cursor) -> Option[tuple[None, Cursor]]:
+    return None if cursor.offset < len(cursor.buffer) else felis.option.Some((None, cursor))
+
+
+def any(cursor: Cursor) -> Option[tuple[int, Cursor]]:
+    buffer, offset = cursor.buffer, cursor.offset
+    return felis.option.Some((buffer[offset], Cursor(buffer, offset + 1))) if offset < len(buffer) else None
+
+
+def satisfies(predicate: Predicate[int]) -> BytesParser[int]:
+    def satisfying(cursor: Cursor) -> Option[tuple[int, Cursor]]:
+        buffer, offset = cursor.buffer, cursor.offset
+        if offset < len(buffer) and predicate(current := buffer[offset]):
+            return felis.option.Some((current, Cursor(buffer, offset + 1)))
+        return None
+
+    return satisfying
+
+
+def byte(byte: int) -> BytesParser[int]:
+    return satisfies(lambda current: current == byte)
+
+
+def literal(data: bytes) -> BytesParser[bytes]:
+    def matching(cursor: Cursor) -> Option[tuple[bytes, Cursor]]:
+        buffer, offset = cursor.buffer, cursor.offset
+        if buffer[offset : offset + len(data)] == memoryview(data):
+            return felis.option.Some((data, Cursor(buffer, offset + len(data))))
+        return None
+
+    return matching
+
+
+def take(count: int) -> BytesParser[memoryview]:
+    def taking(cursor: Cursor) -> Option[tuple[memoryview, Cursor]]:
+        buffer, offset = cursor.buffer, cursor.offset
+        if count < 0 or offset + count > len(buffer):
+            return None
+        return felis.option.Some((buffer[offset : offset + count], Cursor(buffer, offset + count)))
+
+    return taking
+
+
+def take_while(predicate: Predicate[int]) -> BytesParser[memoryview]:
+    def taking(cursor: Cursor) -> Option[tuple[memoryview, Cursor]]:
+        buffer, start = cursor.buffer, cursor.offset
+        offset = start
+        while offset < len(buffer) and predicate(buffer[offset]):
+            offset += 1
+        return felis.option.Some((buffer[start:offset], Cursor(buffer, offset)))
+
+    return taking
+
+
+def structure(format: str | bytes) -> BytesParser[tuple[Any, ...]]:
+    unpacker = struct.Struct(format)
+
+    def unpacking(cursor: Cursor) -> Option[tuple[tuple[Any, ...], Cursor]]:
+        buffer, offset = cursor.buffer, cursor.offset
+        if offset + unpacker.size > len(buffer):
+            return None
+        return felis.option.Some((unpacker.unpack_from(buffer, offset), Cursor(buffer, offset + unpacker.size)))
+
+    return unpacking
+
+
+integer_formats = {1: "b", 2: "h", 4: "i", 8: "q"}
+
+
+byte_orders = {"big": ">", "little": "<"}
+
+
+def first_of(values: tuple[Any, ...]) -> Any:
+    return values[0]
+
+
+@curry
+def signed(size: int, byte_order: Literal["big", "little"]) -> BytesParser[int]:
+    return map_by(first_of)(structure(byte_orders[byte_order] + integer_formats[size]))
+
+
+@curry
+def unsigned(size: int, byte_order: Literal["big", "little"]) -> BytesParser[int]:
+    return map_by(first_of)(structure(byte_orders[byte_order] + integer_formats[size].upper()))
+
+
+def length_prefixed(length: BytesParser[int]) -> BytesParser[memoryview]:
+    return to_bind(length)(take)
+
+
+def many[T](parser: BytesParser[T]) -> BytesParser[list[T]]:
+    def repeated(cursor: Cursor) -> Option[tuple[list[T], Cursor]]:
+        values: list[T] = []
+        while True:
+            match parser(cursor):
+                case felis.option.Some((value, following)) if following.offset != cursor.offset:
+                    values.append(value)
+                    cursor = following
+                case _:
+                    return felis.option.Some((values, cursor))
+
+    return repeated
+
+
+def some[T](parser: BytesParser[T]) -> BytesParser[list[T]]:
+    repeated = many(parser)
+
+    def repeated_at_least_once(cursor: Cursor) -> Option[tuple[list[T], Cursor]]:
+        match repeated(cursor):
+            case felis.option.Some(([], _)):
+                return None
+            case values_and_cursor:
+                return values_and_cursor
+
+    return repeated_at_least_once
+
+
+def option[T](parser: BytesParser[T]) -> BytesParser[Option[T]]:
+    return add_to(map_by(felis.option.pure)(parser))(pure(felis.option.neutral))
+
+
+# [S : *] -> BytesParser S -> [T : *] -> BytesParser T -> BytesParser (list T)
+@curry
+def separated_by[T](parser: BytesParser[T], separator: BytesParser[Any]) -> BytesParser[list[T]]:
+    following = take_after(separator)(parser)
+
+    def separated(cursor: Cursor) -> Option[tuple[list[T], Cursor]]:
+        match parser(cursor):
+            case None:
+                return felis.option.Some(([], cursor))
+            case felis.option.Some((first, cursor)):
+                values = [first]
+                while True:
+                    match following(cursor):
+                        case felis.option.Some((value, rest)) if rest.offset != cursor.offset:
+                            values.append(value)
+                            cursor = rest
+                        case _:
+                            return felis.option.Some((values, cursor))
+
+    return separated
+
+
+# [L : *] -> BytesParser L -> [R : *] -> BytesParser R -> [T : *] -> BytesParser T -> BytesParser T
+@curry
+@curry
+def bracket[T](parser: BytesParser[T], right: BytesParser[Any], left: BytesParser[Any]) -> BytesParser[T]:
+    return take_after(left)(take_before(right)(parser))
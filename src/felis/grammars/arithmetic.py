@@ -0,0 +1,36 @@
+from felis import Float, float
+from felis.parser import (
+    Operators,
+    Parser,
+    add_to,
+    bracket,
+    character,
+    define,
+    end,
+    map_by,
+    memoize,
+    parse_as,
+    precedence,
+    pure,
+    ref,
+    take_after,
+    take_before,
+    take_while_1,
+)
+
+__all__ = ["expression", "parse"]
+
+
+expression: Parser[Float] = ref()
+literal = map_by(Float)(take_while_1(str.isdigit))
+factor = memoize(bracket(character("("))(character(")"))(expression))
+
+multiplication = take_after(character("*"))(pure(float.multiply_by))
+division = take_after(character("/"))(pure(float.divide_by))
+addition = take_after(character("+"))(pure(float.to_add))
+subtraction = take_after(character("-"))(pure(float.from_subtract))
+operators = Operators(infix_left=[(multiplication, 2), (division, 2), (addition, 1), (subtraction, 1)])
+
+define(expression)(precedence(operators)(add_to(factor)(literal)))
+
+parse = parse_as(take_before(end)(expression))
@@ -0,0 +1,26 @@
+from felis.parser import Parser, add_to, bracket, character, end, many, map_by, none_of, optimize, parse_as, recognize, separated_by, some, take_before, text
+
+__all__ = ["document", "parse", "record"]
+
+
+def unquoted(literal: str) -> str:
+    return literal[1:-1].replace('""', '"')
+
+
+def without_trailing_record(records: list[list[str]]) -> list[list[str]]:
+    return records[:-1] if records and records[-1] == [""] else records
+
+
+quote = character('"')
+
+quoted_field = map_by(unquoted)(recognize(bracket(quote)(quote)(many(add_to(recognize(some(none_of('"'))))(text('""'))))))
+
+field: Parser[str] = add_to(quoted_field)(recognize(many(none_of(',"\r\n'))))
+
+record = separated_by(character(","))(field)
+
+newline = add_to(text("\n"))(text("\r\n"))
+
+document = optimize(map_by(without_trailing_record)(take_before(end)(separated_by(newline)(record))))
+
+parse = parse_as(document)
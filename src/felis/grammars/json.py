@@ -0,0 +1,110 @@
+import re
+from typing import Any
+
+from felis.parser import (
+    Parser,
+    add_to,
+    bracket,
+    character,
+    define,
+    end,
+    lift,
+    many,
+    map_by,
+    none_of,
+    one_of,
+    optimize,
+    option,
+    parse_as,
+    pure,
+    recognize,
+    ref,
+    separated_by,
+    some,
+    take_after,
+    take_before,
+    take_while,
+    take_while_1,
+    text,
+)
+
+__all__ = ["document", "parse", "value"]
+
+
+escapes = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+escape = re.compile(r"\\u([dD][89abAB][0-9a-fA-F]{2})\\u([dD][c-fC-F][0-9a-fA-F]{2})|\\(u[0-9a-fA-F]{4}|.)")
+
+
+def unescaped(matched: re.Match[str]) -> str:
+    high, low, code = matched.groups()
+    if high is not None:
+        return chr(0x10000 + ((int(high, 16) - 0xD800) << 10) + int(low, 16) - 0xDC00)
+    return chr(int(code[1:], 16)) if code[0] == "u" else escapes[code]
+
+
+def decoded(literal: str) -> str:
+    return escape.sub(unescaped, literal[1:-1])
+
+
+def number_of(literal: str) -> int | float:
+    return float(literal) if "." in literal or "e" in literal or "E" in literal else int(literal)
+
+
+def object_of(members: list[tuple[str, Any]]) -> dict[str, Any]:
+    return dict(members)
+
+
+whitespace = many(one_of(" \t\n\r"))
+
+
+def token[T](parser: Parser[T]) -> Parser[T]:
+    return take_before(whitespace)(parser)
+
+
+def symbol(string: str) -> Parser[str]:
+    return token(text(string))
+
+
+def constant(string: str, result: object) -> Parser[Any]:
+    return take_after(symbol(string))(pure(result))
+
+
+hexadecimal_digit = one_of("0123456789abcdefABCDEF")
+
+code_unit = take_after(hexadecimal_digit)(take_after(hexadecimal_digit)(take_after(hexadecimal_digit)(hexadecimal_digit)))
+
+escape_sequence = take_after(character("\\"))(add_to(one_of('"\\/bfnrt'))(take_after(character("u"))(code_unit)))
+
+characters = recognize(some(none_of('"\\' + "".join(map(chr, range(0x20))))))
+
+string: Parser[Any] = token(map_by(decoded)(recognize(bracket(character('"'))(character('"'))(many(add_to(characters)(escape_sequence))))))
+
+digits = take_while_1(str.isdecimal)
+
+integer = add_to(text("0"))(take_after(one_of("123456789"))(take_while(str.isdecimal)))
+
+fraction = take_after(character("."))(digits)
+
+exponent = take_after(one_of("eE"))(take_after(option(one_of("+-")))(digits))
+
+numeral = take_after(option(character("-")))(take_after(integer)(take_after(option(fraction))(option(exponent))))
+
+number: Parser[Any] = token(map_by(number_of)(recognize(numeral)))
+
+
+value: Parser[Any] = ref()
+
+array: Parser[Any] = bracket(symbol("["))(symbol("]"))(separated_by(symbol(","))(value))
+
+member: Parser[tuple[str, Any]] = lift(lambda key: lambda item: (key, item))(take_before(symbol(":"))(string))(value)
+
+json_object: Parser[Any] = map_by(object_of)(bracket(symbol("{"))(symbol("}"))(separated_by(symbol(","))(member)))
+
+constants: Parser[Any] = add_to(constant("true", True))(add_to(constant("false", False))(constant("null", None)))
+
+define(value)(add_to(json_object)(add_to(array)(add_to(string)(add_to(number)(constants)))))
+
+document = optimize(take_after(whitespace)(take_before(end)(value)))
+
+parse = parse_as(document)
@@ -1,17 +1,32 @@
-from collections.abc import Callable
-from typing import TYPE_CHECKING, Any
+import builtins
+import copy
+import gc
+import re
+import sys
+import time
+import types
+from collections import OrderedDict
+from collections.abc import Callable, Generator, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cached_property, partial, reduce
+from typing import TYPE_CHECKING, Any, Final
+from weakref import WeakKeyDictionary
 
 import felis.alternative
 import felis.applicative
+import felis.either
 import felis.functor
-import felis.list
 import felis.monad
+import felis.monoid
 import felis.option
+import felis.predicate
 import felis.semigroup
-from felis import function, state
+from felis import function
 from felis.alternative import Alternative
 from felis.applicative import Applicative
 from felis.currying import curry
+from felis.either import Either
 from felis.functor import Functor
 from felis.monad import Monad
 from felis.monoid import Monoid
@@ -20,7 +35,16 @@ from felis.predicate import Predicate
 from felis.semigroup import Semigroup
 
 __all__ = [
+    "Cursor",
+    "Edit",
+    "Grammar",
+    "Match",
+    "Memo",
+    "Operators",
+    "ParseCache",
     "Parser",
+    "Profile",
+    "Statistics",
     "add_to",
     "alnum",
     "alpha",
@@ -31,35 +55,67 @@ __all__ = [
     "bind_to",
     "bracket",
     "by_map",
+    "cached_parse_as",
     "chain_left",
     "chain_left_1",
     "chain_right",
     "chain_right_1",
     "character",
+    "column",
+    "commit",
     "compose_after",
     "compose_before",
+    "cut",
+    "define",
     "digit",
     "discard_after",
     "discard_before",
+    "edited",
     "end",
+    "find_all",
+    "fix",
     "functor",
+    "grammar_of",
     "guard",
+    "hit_rate",
+    "incremental_parse_as",
     "join",
+    "left_recursive",
     "lift",
+    "line",
     "many",
+    "many_into",
     "map_by",
+    "memo_capacity",
+    "memoize",
     "monad",
     "monoid",
+    "named",
     "neutral",
+    "none_of",
+    "one_of",
+    "one_of_texts",
+    "optimize",
     "option",
+    "packrat_parse_as",
     "parse_as",
+    "parse_as_either",
+    "precedence",
+    "profiling",
     "pure",
+    "recognize",
+    "ref",
+    "regex",
+    "report",
     "satisfies",
     "semigroup",
     "separated_by",
+    "skip_spaces",
     "some",
     "take_after",
     "take_before",
+    "take_while",
+    "take_while_1",
     "text",
     "to_add",
     "to_apply",
@@ -68,7 +124,222 @@ __all__ = [
 ]
 
 
-type Parser[T] = Callable[[str], Option[tuple[T, str]]]
+class Cursor:
+    __match_args__ = ("string", "offset")
+
+    def __init__(self, string: str, offset: int):
+        self.string: Final = string
+        self.offset: Final = offset
+
+
+type Parser[T] = Callable[[Cursor], Option[tuple[T, Cursor]]]
+
+
+class Grammar:
+    __match_args__ = ("combinator", "operands", "constructor")
+
+    def __init__(self, combinator: str, operands: tuple[Any, ...], constructor: Callable[..., Any] | None = None):
+        self.combinator: Final = combinator
+        self.operands: Final = operands
+        self.constructor: Final = constructor
+
+
+# [T : *] -> Grammar -> Parser T -> Parser T
+@curry
+def described[T](parser: Parser[T], grammar: Grammar) -> Parser[T]:
+    vars(parser)["grammar"] = grammar
+    return parser
+
+
+def grammar_of(parser: Parser[Any]) -> Option[Grammar]:
+    grammar = vars(parser).get("grammar") if hasattr(parser, "__dict__") else None
+    return None if grammar is None else felis.option.Some(grammar)
+
+
+def line(cursor: Cursor) -> int:
+    return cursor.string.count("\n", 0, cursor.offset) + 1
+
+
+def column(cursor: Cursor) -> int:
+    return cursor.offset - cursor.string.rfind("\n", 0, cursor.offset)
+
+
+class Memo:
+    def __init__(self, string: str, capacity: int):
+        self.string: Final = string
+        self.capacity: Final = capacity
+        self.results: Final[OrderedDict[tuple[Parser[Any], int], tuple[Option[tuple[Any, Cursor]], int]]] = OrderedDict()
+        self.offsets: Final[dict[int, set[Parser[Any]]]] = {}
+        self.released = 0
+        self.seeds: Final[dict[tuple[Parser[Any], int], Option[tuple[Any, Cursor]]]] = {}
+        self.depths: Final[dict[tuple[Parser[Any], int], int]] = {}
+        self.failure = 0
+        self.examined = 0
+        self.involved = 0
+
+
+memo_capacity = 1 << 16
+
+
+current_memo: ContextVar[Memo | None] = ContextVar("current_memo", default=None)
+
+
+class Frontier:
+    def __init__(self) -> None:
+        self.reached = False
+
+
+current_frontier: ContextVar[Frontier | None] = ContextVar("current_frontier", default=None)
+
+
+class Choice:
+    def __init__(self, start: int, enclosing: "Choice | None"):
+        self.start: Final = start
+        self.enclosing: Final = enclosing
+        self.committed = False
+
+
+current_choice: ContextVar[Choice | None] = ContextVar("current_choice", default=None)
+
+
+def chosen[T](parser: Parser[T], cursor: Cursor) -> tuple[Option[tuple[T, Cursor]], bool]:
+    choice = Choice(cursor.offset, current_choice.get())
+    token = current_choice.set(choice)
+    try:
+        return parser(cursor), choice.committed
+    finally:
+        current_choice.reset(token)
+
+
+class Slot:
+    def __init__(self) -> None:
+        self.value: Any = None
+
+
+type Step = Callable[[str, int, Slot], int]
+
+
+failed = -1
+
+
+abandoned = -2
+
+
+def stepped[T](step: Step) -> Parser[T]:
+    def parsing(cursor: Cursor) -> Option[tuple[T, Cursor]]:
+        slot = Slot()
+        end = step(cursor.string, cursor.offset, slot)
+        return None if end < 0 else felis.option.Some((slot.value, Cursor(cursor.string, end)))
+
+    vars(parsing)["step"] = step
+    return parsing
+
+
+def step_of(parser: Parser[Any]) -> Step:
+    step = vars(parser).get("step") if hasattr(parser, "__dict__") else None
+    if step is not None:
+        return step
+
+    def adapted(string: str, offset: int, slot: Slot) -> int:
+        match parser(Cursor(string, offset)):
+            case None:
+                return failed
+            case felis.option.Some((value, cursor)):
+                slot.value = value
+                return cursor.offset
+
+    return adapted
+
+
+def chosen_step(step: Step, string: str, offset: int, slot: Slot) -> int:
+    choice = Choice(offset, current_choice.get())
+    token = current_choice.set(choice)
+    try:
+        end = step(string, offset, slot)
+    finally:
+        current_choice.reset(token)
+    return abandoned if end == failed and choice.committed else end
+
+
+def scoped_step(parser: Parser[Any]) -> Step:
+    step = step_of(parser)
+    decided: list[Step] = []
+
+    def deciding(string: str, offset: int, slot: Slot) -> int:
+        if not decided:
+            decided.append(partial(chosen_step, step) if may_cut(parser, {}) else step)
+        return decided[0](string, offset, slot)
+
+    return deciding
+
+
+def run_step[T](parser: Parser[T], string: str, offset: int) -> Option[tuple[T, int]]:
+    slot = Slot()
+    end = step_of(parser)(string, offset, slot)
+    return None if end < 0 else felis.option.Some((slot.value, end))
+
+
+def value_of[T](result: Option[tuple[T, int]]) -> Option[T]:
+    match result:
+        case None:
+            return None
+        case felis.option.Some((value, _)):
+            return felis.option.Some(value)
+
+
+def examine(string: str, extent: int) -> None:
+    memo = current_memo.get()
+    if memo is not None and memo.string is string and extent > memo.examined:
+        memo.examined = extent
+
+
+def fail(cursor: Cursor, width: int = 1) -> None:
+    fail_at(cursor.string, cursor.offset, width)
+
+
+def fail_at(string: str, offset: int, width: int = 1) -> None:
+    memo = current_memo.get()
+    if memo is not None and memo.string is string:
+        memo.failure = max(memo.failure, offset)
+        memo.examined = max(memo.examined, offset + width)
+
+
+def reach_end() -> None:
+    frontier = current_frontier.get()
+    if frontier is not None:
+        frontier.reached = True
+
+
+def examined_through_end(string: str, start: int, end: int) -> int:
+    return len(string) + 1
+
+
+def pattern_match(
+    compiled: re.Pattern[str],
+    string: str,
+    offset: int,
+    examined: Callable[[str, int, int], int] = examined_through_end,
+) -> re.Match[str] | None:
+    matched = compiled.match(string, offset)
+    extent = examined(string, offset, failed if matched is None else matched.end())
+    if extent > len(string):
+        reach_end()
+    if matched is None:
+        fail_at(string, offset, extent - offset)
+    else:
+        examine(string, extent)
+    return matched
+
+
+# [T : *] -> int -> Parser T -> str -> Option T
+@curry
+@curry
+def packrat_parse_as[T](string: str, parser_value: Parser[T], capacity: int) -> Option[T]:
+    token = current_memo.set(Memo(string, capacity))
+    try:
+        return value_of(run_step(parser_value, string, 0))
+    finally:
+        current_memo.reset(token)
 
 
 if TYPE_CHECKING:
@@ -77,16 +348,374 @@ if TYPE_CHECKING:
     def parse_as[T](string: str, parser_value: Parser[T]) -> Option[T]: ...
 
 else:
-    parse_as = state.starting_with_run_t(felis.option.functor)
+    parse_as = packrat_parse_as(memo_capacity)
 
 
-if TYPE_CHECKING:
+# [T : *] -> Parser T -> str -> Either Cursor T
+@curry
+def parse_as_either[T](string: str, parser_value: Parser[T]) -> Either[Cursor, T]:
+    memo = Memo(string, memo_capacity)
+    token = current_memo.set(memo)
+    try:
+        result = run_step(parser_value, string, 0)
+    finally:
+        current_memo.reset(token)
+    match result:
+        case None:
+            return felis.either.Left(Cursor(string, memo.failure))
+        case felis.option.Some((value, _)):
+            return felis.either.Right(value)
+
+
+# [T : *] -> Parser T -> Memo -> Option T
+@curry
+def incremental_parse_as[T](memo: Memo, parser_value: Parser[T]) -> Option[T]:
+    token = current_memo.set(memo)
+    try:
+        return value_of(run_step(parser_value, memo.string, 0))
+    finally:
+        current_memo.reset(token)
 
-    @curry
-    def to_add[T](augend: Parser[T], addend: Parser[T]) -> Parser[T]: ...
 
-else:
-    to_add = felis.option.to_add_t(function.monad)
+class Match[T]:
+    def __init__(self, value: T, start: int, end: int):
+        self.value: Final = value
+        self.start: Final = start
+        self.end: Final = end
+
+
+find_characters = 8
+
+
+def first_characters(first: "First", string: str) -> frozenset[str] | None:
+    if first.nullable:
+        return None
+    if first.characters is not None:
+        return first.characters
+    return frozenset(filter(first.admits, set(string)))
+
+
+def next_candidate(string: str, offset: int, positions: dict[str, int], pattern: re.Pattern[str] | None) -> int:
+    if pattern is not None:
+        found = pattern.search(string, offset)
+        return len(string) if found is None else found.start()
+    for character, position in positions.items():
+        if position < offset:
+            found = string.find(character, offset)
+            positions[character] = len(string) if found < 0 else found
+    return min(positions.values(), default=len(string))
+
+
+# [T : *] -> Parser T -> str -> Iterator (Match T)
+@curry
+def find_all[T](string: str, parser_value: Parser[T]) -> Iterator[Match[T]]:
+    step = step_of(parser_value)
+    characters = first_characters(first_of(parser_value), string)
+    few = characters is None or len(characters) <= find_characters
+    positions = dict.fromkeys(characters or (), -1) if few else {}
+    pattern = None if few else re.compile(characters_class("".join(sorted(characters or ())), negated=False))
+    memo = Memo(string, memo_capacity)
+    slot = Slot()
+    offset = 0
+    while offset <= len(string):
+        start = offset if characters is None else next_candidate(string, offset, positions, pattern)
+        if start == len(string) and characters is not None:
+            return
+        token = current_memo.set(memo)
+        try:
+            end = step(string, start, slot)
+        finally:
+            current_memo.reset(token)
+        if end < 0:
+            offset = start + 1
+        else:
+            yield Match(slot.value, start, end)
+            offset = max(end, start + 1)
+
+
+class Edit:
+    def __init__(self, offset: int, removed: int, inserted: str):
+        self.offset: Final = offset
+        self.removed: Final = removed
+        self.inserted: Final = inserted
+
+
+def relocated(result: Option[tuple[Any, Cursor]], string: str, shift: int) -> Option[tuple[Any, Cursor]]:
+    match result:
+        case None:
+            return None
+        case felis.option.Some((value, cursor)):
+            return felis.option.Some((value, Cursor(string, cursor.offset + shift)))
+
+
+# Edit -> Memo -> Memo
+@curry
+def edited(memo: Memo, edit: Edit) -> Memo:
+    string = memo.string[: edit.offset] + edit.inserted + memo.string[edit.offset + edit.removed :]
+    reused = Memo(string, memo.capacity)
+    shift = len(edit.inserted) - edit.removed
+    for (parser, start), (result, examined) in memo.results.items():
+        if examined <= edit.offset:
+            remember(reused, (parser, start), relocated(result, string, 0), examined)
+        elif start >= edit.offset + edit.removed:
+            remember(reused, (parser, start + shift), relocated(result, string, shift), examined + shift)
+    return reused
+
+
+class ParseCache:
+    def __init__(self, budget: int):
+        self.budget: Final = budget
+        self.results: Final[OrderedDict[tuple[Parser[Any], str], tuple[Option[Any], int]]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+
+def hit_rate(cache: ParseCache) -> float:
+    lookups = cache.hits + cache.misses
+    return cache.hits / lookups if lookups else 0.0
+
+
+def deep_size(value: object) -> int:
+    seen: set[int] = set()
+    pending = [value]
+    size = 0
+    while pending:
+        current = pending.pop()
+        if id(current) not in seen and not isinstance(current, type | types.ModuleType | types.FunctionType):
+            seen.add(id(current))
+            size += sys.getsizeof(current)
+            pending.extend(gc.get_referents(current))
+    return size
+
+
+# [T : *] -> ParseCache -> Parser T -> str -> Option T
+@curry
+@curry
+def cached_parse_as[T](string: str, parser_value: Parser[T], cache: ParseCache) -> Option[T]:
+    key = (parser_value, string)
+    if key in cache.results:
+        cache.hits += 1
+        cache.results.move_to_end(key)
+        return copy.deepcopy(cache.results[key][0])
+    cache.misses += 1
+    result = parse_as(parser_value)(string)
+    size = deep_size((string, result))
+    if size <= cache.budget:
+        cache.results[key] = copy.deepcopy(result), size
+        cache.size += size
+        while cache.size > cache.budget:
+            _, (_, evicted) = cache.results.popitem(last=False)
+            cache.size -= evicted
+    return result
+
+
+def remember(memo: Memo, key: tuple[Parser[Any], int], result: Option[tuple[Any, Cursor]], examined: int) -> None:
+    parser, offset = key
+    if offset < memo.released:
+        return
+    memo.results[key] = result, examined
+    memo.offsets.setdefault(offset, set()).add(parser)
+    if len(memo.results) > memo.capacity:
+        forget(memo, next(iter(memo.results)))
+
+
+def forget(memo: Memo, key: tuple[Parser[Any], int]) -> None:
+    parser, offset = key
+    del memo.results[key]
+    parsers = memo.offsets[offset]
+    parsers.discard(parser)
+    if not parsers:
+        del memo.offsets[offset]
+
+
+def recall(memo: Memo, key: tuple[Parser[Any], int]) -> Option[tuple[Any, Cursor]]:
+    memo.results.move_to_end(key)
+    result, examined = memo.results[key]
+    memo.examined = max(memo.examined, examined)
+    return result
+
+
+def consumed(result: Option[tuple[Any, Cursor]], examined: int) -> int:
+    match result:
+        case None:
+            return examined
+        case felis.option.Some((_, cursor)):
+            return max(examined, cursor.offset)
+
+
+def memoized_step(parser: Parser[Any], step: Step, string: str, offset: int, slot: Slot) -> int:
+    memo = current_memo.get()
+    if memo is None or memo.string is not string:
+        return max(chosen_step(step, string, offset, slot), failed)
+    key = (parser, offset)
+    if key in memo.results:
+        match recall(memo, key):
+            case None:
+                return failed
+            case felis.option.Some((value, cursor)):
+                slot.value = value
+                return cursor.offset
+    outer, memo.examined = memo.examined, offset
+    outer_involved, memo.involved = memo.involved, len(memo.seeds)
+    end = max(chosen_step(step, string, offset, slot), failed)
+    result = None if end == failed else felis.option.Some((slot.value, Cursor(string, end)))
+    examined = consumed(result, memo.examined)
+    memo.examined = max(outer, examined)
+    involved, memo.involved = memo.involved, min(outer_involved, memo.involved)
+    if involved >= len(memo.seeds):
+        remember(memo, key, result, examined)
+    return end
+
+
+def memoize[T](parser: Parser[T]) -> Parser[T]:
+    step = step_of(parser)
+
+    def memoized(string: str, offset: int, slot: Slot) -> int:
+        return memoized_step(parser, step, string, offset, slot)
+
+    return described(Grammar("memoize", (parser,), memoize))(stepped(memoized))
+
+
+def left_recursive[T](parser: Parser[T]) -> Parser[T]:
+    def grown(cursor: Cursor) -> Option[tuple[T, Cursor]]:
+        memo = current_memo.get()
+        if memo is None or memo.string is not cursor.string:
+            token = current_memo.set(Memo(cursor.string, memo_capacity))
+            try:
+                return grown(cursor)
+            finally:
+                current_memo.reset(token)
+        key = (parser, cursor.offset)
+        if key in memo.seeds:
+            memo.involved = min(memo.involved, memo.depths[key])
+            return memo.seeds[key]
+        if key in memo.results:
+            return recall(memo, key)
+        outer, memo.examined = memo.examined, cursor.offset
+        outer_involved, memo.involved = memo.involved, len(memo.seeds)
+        memo.depths[key] = len(memo.seeds)
+        memo.seeds[key] = None
+        try:
+            while True:
+                match chosen(parser, cursor)[0], memo.seeds[key]:
+                    case None, _:
+                        break
+                    case felis.option.Some((_, grown_cursor)), felis.option.Some((_, seed_cursor)) if grown_cursor.offset <= seed_cursor.offset:
+                        break
+                    case result, _:
+                        memo.seeds[key] = result
+        finally:
+            result = memo.seeds.pop(key)
+            depth = memo.depths.pop(key)
+        examined = consumed(result, memo.examined)
+        memo.examined = max(outer, examined)
+        involved, memo.involved = memo.involved, min(outer_involved, memo.involved)
+        if involved >= depth:
+            remember(memo, key, result, examined)
+        return result
+
+    return described(Grammar("left_recursive", (parser,), left_recursive))(grown)
+
+
+class Statistics:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self.discarded = 0
+        self.active = 0
+
+
+class Profile:
+    def __init__(self) -> None:
+        self.rules: Final[dict[str, Statistics]] = {}
+        self.spans: Final[list[tuple[Statistics, int, int]]] = []
+
+
+current_profile: ContextVar[Profile | None] = ContextVar("current_profile", default=None)
+
+
+@contextmanager
+def profiling() -> Generator[Profile]:
+    profile = Profile()
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+
+
+def report(profile: Profile) -> str:
+    header = f"{'rule':<24} {'calls':>10} {'successes':>10} {'failures':>10} {'seconds':>10} {'discarded':>10}"
+    rows = (
+        f"{name:<24} {rule.calls:>10} {rule.successes:>10} {rule.failures:>10} {rule.seconds:>10.6f} {rule.discarded:>10}"
+        for name, rule in sorted(profile.rules.items(), key=lambda item: item[1].seconds, reverse=True)
+    )
+    return "\n".join((header, *rows))
+
+
+# [T : *] -> str -> Parser T -> Parser T
+@curry
+def named[T](parser: Parser[T], name: str) -> Parser[T]:
+    step = step_of(parser)
+
+    def profiled(string: str, offset: int, slot: Slot) -> int:
+        profile = current_profile.get()
+        if profile is None:
+            return step(string, offset, slot)
+        rule = profile.rules.setdefault(name, Statistics())
+        memo = current_memo.get()
+        failure = 0 if memo is None else memo.failure
+        if memo is not None:
+            memo.failure = offset
+        rule.calls += 1
+        rule.active += 1
+        start = time.perf_counter()
+        try:
+            end = step(string, offset, slot)
+        finally:
+            rule.active -= 1
+            if not rule.active:
+                rule.seconds += time.perf_counter() - start
+        reached = offset if memo is None else memo.failure
+        if memo is not None:
+            memo.failure = max(failure, reached)
+        if end < 0:
+            rule.failures += 1
+            rule.discarded += reached - offset
+        else:
+            rule.successes += 1
+            profile.spans.append((rule, offset, end))
+        return end
+
+    return described(Grammar("named", (name, parser), named))(stepped(profiled))
+
+
+def discard_from(offset: int) -> None:
+    profile = current_profile.get()
+    if profile is not None:
+        while profile.spans and profile.spans[-1][1] >= offset:
+            rule, start, end = profile.spans.pop()
+            rule.discarded += end - start
+
+
+# [T : *] -> Parser T -> Parser T -> Parser T
+@curry
+def to_add[T](augend: Parser[T], addend: Parser[T]) -> Parser[T]:
+    augend_step, addend_step = scoped_step(augend), scoped_step(addend)
+
+    def added(string: str, offset: int, slot: Slot) -> int:
+        end = augend_step(string, offset, slot)
+        if end == failed:
+            discard_from(offset)
+            end = addend_step(string, offset, slot)
+        if end < 0:
+            discard_from(offset)
+        return max(end, failed)
+
+    return described(Grammar("to_add", (addend, augend), to_add))(stepped(added))
 
 
 # [T : *] -> Semigroup (Parser T)
@@ -103,20 +732,25 @@ else:
 
 
 # [T : *] -> Parser T
-neutral: Parser[Any] = felis.option.neutral_t(function.monad)
+neutral: Parser[Any] = described(Grammar("neutral", ()))(stepped(lambda string, offset, slot: failed))
 
 
 # [T : *] -> Monoid (Parser T)
 monoid = Monoid(semigroup, neutral)
 
 
-if TYPE_CHECKING:
+# [From : *] -> [To : *] -> (From -> To) -> Parser From -> Parser To
+@curry
+def map_by[From, To](parser_value: Parser[From], function: Callable[[From], To]) -> Parser[To]:
+    step = step_of(parser_value)
 
-    @curry
-    def map_by[From, To](parser_value: Parser[From], function: Callable[[From], To]) -> Parser[To]: ...
+    def mapped(string: str, offset: int, slot: Slot) -> int:
+        end = step(string, offset, slot)
+        if end != failed:
+            slot.value = function(slot.value)
+        return end
 
-else:
-    map_by = state.map_by_t(felis.option.functor)
+    return described(Grammar("map_by", (function, parser_value), map_by))(stepped(mapped))
 
 
 # Functor Parser
@@ -132,21 +766,31 @@ else:
     by_map = felis.functor.by_map(functor)
 
 
-if TYPE_CHECKING:
+# [T : *] -> T -> Parser T
+def pure[T](value: T, /) -> Parser[T]:
+    def purely(string: str, offset: int, slot: Slot) -> int:
+        slot.value = value
+        return offset
 
-    def pure[T](value: T, /) -> Parser[T]: ...
-
-else:
-    pure = state.pure_t(felis.option.applicative)
+    return described(Grammar("pure", (value,), pure))(stepped(purely))
 
 
-if TYPE_CHECKING:
+# [From : *] -> [To : *] -> Parser (From -> To) -> Parser From -> Parser To
+@curry
+def to_apply[From, To](parser_value: Parser[From], parser_function: Parser[Callable[[From], To]]) -> Parser[To]:
+    function_step, value_step = step_of(parser_function), step_of(parser_value)
 
-    @curry
-    def to_apply[From, To](parser_value: Parser[From], parser_function: Parser[Callable[[From], To]]) -> Parser[To]: ...
+    def applied(string: str, offset: int, slot: Slot) -> int:
+        offset = function_step(string, offset, slot)
+        if offset == failed:
+            return failed
+        function = slot.value
+        offset = value_step(string, offset, slot)
+        if offset != failed:
+            slot.value = function(slot.value)
+        return offset
 
-else:
-    to_apply = state.to_apply_t(felis.option.monad)
+    return described(Grammar("to_apply", (parser_function, parser_value), to_apply))(stepped(applied))
 
 
 # Applicative Parser
@@ -233,12 +877,15 @@ else:
     guard = felis.alternative.guard(alternative)
 
 
-if TYPE_CHECKING:
+# [T : *] -> Parser (Parser T) -> Parser T
+def join[T](parser_value: Parser[Parser[T]], /) -> Parser[T]:
+    step = step_of(parser_value)
 
-    def join[T](parser_value: Parser[Parser[T]], /) -> Parser[T]: ...
+    def joined(string: str, offset: int, slot: Slot) -> int:
+        offset = step(string, offset, slot)
+        return failed if offset == failed else step_of(slot.value)(string, offset, slot)
 
-else:
-    join = state.join_t(felis.option.monad)
+    return described(Grammar("join", (parser_value,), join))(stepped(joined))
 
 
 # Monad Parser
@@ -291,42 +938,311 @@ else:
     compose_before = felis.monad.compose_before(monad)
 
 
-def end(string: str) -> Option[tuple[None, str]]:
-    return None if string else felis.option.Some((None, ""))
+def ending(string: str, offset: int, slot: Slot) -> int:
+    if offset < len(string):
+        fail_at(string, offset)
+        return failed
+    examine(string, offset + 1)
+    reach_end()
+    slot.value = None
+    return offset
+
+
+end: Parser[None] = described(Grammar("end", ()))(stepped(ending))
+
 
+def anything(string: str, offset: int, slot: Slot) -> int:
+    if offset < len(string):
+        slot.value = string[offset]
+        return offset + 1
+    fail_at(string, offset)
+    reach_end()
+    return failed
 
-def any(string: str) -> Option[tuple[str, str]]:
-    return felis.option.Some((string[0], string[1:])) if string else None
+
+any: Parser[str] = described(Grammar("any", ()))(stepped(anything))
 
 
 def satisfies(predicate: Predicate[str]) -> Parser[str]:
-    return to_bind(any)(lambda character: pure(character) if predicate(character) else neutral)
+    def satisfying(string: str, offset: int, slot: Slot) -> int:
+        if offset < len(string):
+            current = string[offset]
+            if predicate(current):
+                slot.value = current
+                return offset + 1
+        else:
+            reach_end()
+        fail_at(string, offset)
+        return failed
+
+    return described(Grammar("satisfies", (predicate,), satisfies))(stepped(satisfying))
+
+
+def taken(predicate: Predicate[str], string: str, start: int) -> int:
+    offset = start
+    while offset < len(string) and predicate(string[offset]):
+        offset += 1
+    examine(string, offset + 1)
+    if offset == len(string):
+        reach_end()
+    return offset
+
+
+def take_while(predicate: Predicate[str]) -> Parser[str]:
+    def taking(string: str, start: int, slot: Slot) -> int:
+        offset = taken(predicate, string, start)
+        slot.value = string[start:offset]
+        return offset
+
+    return described(Grammar("take_while", (predicate,), take_while))(stepped(taking))
+
+
+def take_while_1(predicate: Predicate[str]) -> Parser[str]:
+    def taking_at_least_one(string: str, start: int, slot: Slot) -> int:
+        offset = taken(predicate, string, start)
+        if offset == start:
+            fail_at(string, start)
+            return failed
+        slot.value = string[start:offset]
+        return offset
+
+    return described(Grammar("take_while_1", (predicate,), take_while_1))(stepped(taking_at_least_one))
+
+
+def regex(pattern: str | re.Pattern[str], lookahead: int | None = None) -> Parser[str]:
+    compiled = re.compile(pattern)
+    examined = regex_extent(lookahead).examined
+
+    def matching(string: str, offset: int, slot: Slot) -> int:
+        match pattern_match(compiled, string, offset, examined):
+            case None:
+                return failed
+            case matched:
+                slot.value = matched.group()
+                return matched.end()
+
+    return described(Grammar("regex", (compiled, lookahead), regex))(stepped(matching))
 
 
 def character(character: str) -> Parser[str]:
-    return satisfies(lambda current: current == character)
+    return described(Grammar("character", (character,)))(satisfies(lambda current: current == character))
+
+
+def one_of(characters: str) -> Parser[str]:
+    return described(Grammar("one_of", (characters,), one_of))(satisfies(lambda current: current in characters))
+
+
+def none_of(characters: str) -> Parser[str]:
+    return described(Grammar("none_of", (characters,), none_of))(satisfies(lambda current: current not in characters))
 
 
 def text(string: str) -> Parser[str]:
-    return take_after(character(string[0]))(take_after(text(string[1:]))(pure(string))) if string else pure("")
+    def matching(subject: str, offset: int, slot: Slot) -> int:
+        if subject.startswith(string, offset):
+            slot.value = string
+            return offset + len(string)
+        if len(subject) - offset < len(string) and string.startswith(subject[offset:]):
+            reach_end()
+        fail_at(subject, offset, len(string))
+        return failed
+
+    return described(Grammar("text", (string,), text))(stepped(matching))
+
+
+class Trie:
+    def __init__(self) -> None:
+        self.children: Final[dict[str, Trie]] = {}
+        self.text: str | None = None
+
+
+def trie_of(texts: Iterable[str]) -> Trie:
+    root = Trie()
+    for string in texts:
+        node = root
+        for current in string:
+            node = node.children.setdefault(current, Trie())
+        node.text = string
+    return root
+
+
+def one_of_texts(texts: Iterable[str]) -> Parser[str]:
+    texts = tuple(texts)
+    root = trie_of(texts)
+
+    def matching(string: str, start: int, slot: Slot) -> int:
+        node, matched, end, offset = root, root.text, start, start
+        while offset < len(string) and (child := node.children.get(string[offset])) is not None:
+            node, offset = child, offset + 1
+            if node.text is not None:
+                matched, end = node.text, offset
+        examine(string, offset + 1)
+        if offset == len(string) and node.children:
+            reach_end()
+        if matched is None:
+            fail_at(string, start)
+            return failed
+        slot.value = matched
+        return end
+
+    return described(Grammar("one_of_texts", (texts,), one_of_texts))(stepped(matching))
+
+
+def cutting(string: str, offset: int, slot: Slot) -> int:
+    choice = current_choice.get()
+    if choice is not None and not choice.committed:
+        choice.committed = True
+        release(choice, string, offset)
+    slot.value = None
+    return offset
+
+
+cut: Parser[None] = described(Grammar("cut", ()))(stepped(cutting))
+
+
+def release(choice: Choice, string: str, offset: int) -> None:
+    memo = current_memo.get()
+    if memo is None or memo.string is not string:
+        return
+    floor = offset
+    enclosing = choice.enclosing
+    while enclosing is not None:
+        if not enclosing.committed:
+            floor = min(floor, enclosing.start)
+        enclosing = enclosing.enclosing
+    for start in range(memo.released, floor):
+        for parser in memo.offsets.pop(start, ()):
+            del memo.results[parser, start]
+    memo.released = max(memo.released, floor)
+
+
+def commit[T](parser: Parser[T]) -> Parser[T]:
+    return take_before(cut)(parser)
+
+
+class Reference:
+    def __init__(self) -> None:
+        self.target: Parser[Any] = neutral
+
+
+def ref[T]() -> Parser[T]:
+    reference = Reference()
+
+    def referring(string: str, offset: int, slot: Slot) -> int:
+        return step_of(reference.target)(string, offset, slot)
+
+    return described(Grammar("ref", (reference,)))(stepped(referring))
+
+
+def reference_of(parser: Parser[Any]) -> Option[Reference]:
+    match grammar_of(parser):
+        case felis.option.Some(Grammar("ref", (reference,))):
+            return felis.option.Some(reference)
+        case _:
+            return None
+
+
+# [T : *] -> Parser T -> Parser T -> Parser T
+@curry
+def define[T](parser: Parser[T], reference: Parser[T]) -> Parser[T]:
+    match reference_of(reference):
+        case None:
+            pass
+        case felis.option.Some(cell):
+            cell.target = parser
+    return reference
+
+
+def fix[T](function: Callable[[Parser[T]], Parser[T]]) -> Parser[T]:
+    reference: Parser[T] = ref()
+    return define(reference)(function(reference))
+
+
+def repetition(step: Step, string: str, offset: int, values: list[Any], slot: Slot) -> int:
+    while True:
+        end = step(string, offset, slot)
+        if end < 0:
+            return failed if end == abandoned else offset
+        if end == offset:
+            return offset
+        values.append(slot.value)
+        offset = end
 
 
 def many[T](parser: Parser[T]) -> Parser[list[T]]:
-    return to_add(pure(felis.list.neutral))(to_bind(parser)(lambda first: to_bind(many(parser))(lambda rest: pure([first, *rest]))))
+    step = scoped_step(parser)
+
+    def repeated(string: str, offset: int, slot: Slot) -> int:
+        values: list[T] = []
+        offset = repetition(step, string, offset, values, slot)
+        slot.value = values
+        return offset
+
+    return described(Grammar("many", (parser,), many))(stepped(repeated))
 
 
 def some[T](parser: Parser[T]) -> Parser[list[T]]:
-    return to_bind(parser)(lambda first: to_bind(many(parser))(lambda rest: pure([first, *rest])))
+    step = scoped_step(parser)
+
+    def repeated_at_least_once(string: str, offset: int, slot: Slot) -> int:
+        values: list[T] = []
+        end = repetition(step, string, offset, values, slot)
+        slot.value = values
+        return failed if not values else end
+
+    return described(Grammar("some", (parser,), some))(stepped(repeated_at_least_once))
+
+
+# [M : *] -> Monoid M -> Parser M -> Parser M
+@curry
+def many_into[M](parser: Parser[M], monoid: Monoid[M]) -> Parser[M]:
+    step = scoped_step(parser)
+
+    def folded(string: str, offset: int, slot: Slot) -> int:
+        accumulator = felis.monoid.neutral(monoid)
+        while True:
+            end = step(string, offset, slot)
+            if end < 0 or end == offset:
+                slot.value = accumulator
+                return failed if end == abandoned else offset
+            accumulator = felis.monoid.add_to(monoid)(accumulator)(slot.value)
+            offset = end
+
+    return described(Grammar("many_into", (monoid, parser), many_into))(stepped(folded))
 
 
 def option[T](parser: Parser[T]) -> Parser[Option[T]]:
-    return to_add(pure(felis.option.neutral))(map_by(felis.option.pure)(parser))
+    return described(Grammar("option", (parser,), option))(to_add(pure(felis.option.neutral))(map_by(felis.option.pure)(parser)))
+
+
+def recognize(parser: Parser[Any]) -> Parser[str]:
+    step = step_of(parser)
+
+    def recognized(string: str, offset: int, slot: Slot) -> int:
+        end = step(string, offset, slot)
+        if end >= 0:
+            slot.value = string[offset:end]
+        return end
+
+    return described(Grammar("recognize", (parser,), recognize))(stepped(recognized))
 
 
 # [S : *] -> Parser S -> [T : *] -> Parser T -> Parser (list T)
 @curry
 def separated_by[T](parser: Parser[T], separator: Parser[Any]) -> Parser[list[T]]:
-    return to_add(pure(felis.list.neutral))(to_bind(parser)(lambda first: to_bind(many(take_after(separator)(parser)))(lambda rest: pure([first, *rest]))))
+    step, following = scoped_step(parser), scoped_step(take_after(separator)(parser))
+
+    def separated(string: str, offset: int, slot: Slot) -> int:
+        values: list[T] = []
+        end = step(string, offset, slot)
+        if end >= 0:
+            values.append(slot.value)
+            end = repetition(following, string, end, values, slot)
+        elif end == failed:
+            end = offset
+        slot.value = values
+        return max(end, failed)
+
+    return described(Grammar("separated_by", (separator, parser), separated_by))(stepped(separated))
 
 
 # [L : *] -> Parser L -> [R : *] -> Parser R -> [T : *] -> Parser T -> Parser T
@@ -336,41 +1252,181 @@ def bracket[T](parser: Parser[T], right: Parser[Any], left: Parser[Any]) -> Pars
     return take_after(left)(take_before(right)(parser))
 
 
+def paired[F, V](function: F) -> Callable[[V], tuple[F, V]]:
+    def pairing(value: V) -> tuple[F, V]:
+        return function, value
+
+    return pairing
+
+
+def chained[F, T](parser_function: Parser[F], parser_value: Parser[T]) -> Parser[list[tuple[F, T]]]:
+    return many(lift(paired)(parser_function)(parser_value))
+
+
 @curry
 @curry
 def chain_right[R, T](parser_value: Parser[T], parser_function: Parser[Callable[[T], Callable[[R], R]]], accumulator: R) -> Parser[R]:
-    return to_add(pure(accumulator))(
-        to_bind(parser_function)(
-            lambda function: to_bind(parser_value)(
-                lambda value: to_bind(chain_right(accumulator)(parser_function)(parser_value))(lambda accumulator: pure(function(value)(accumulator))),
-            ),
-        ),
-    )
+    steps = chained(parser_function, parser_value)
+
+    def folded(cursor: Cursor) -> Option[tuple[R, Cursor]]:
+        match steps(cursor):
+            case None:
+                return None
+            case felis.option.Some((pairs, cursor)):
+                result = accumulator
+                for function, value in reversed(pairs):
+                    result = function(value)(result)
+                return felis.option.Some((result, cursor))
+
+    return described(Grammar("chain_right", (accumulator, parser_function, parser_value), chain_right))(folded)
 
 
 @curry
 def chain_right_1[T](parser_value: Parser[T], parser_function: Parser[Callable[[T], Callable[[T], T]]]) -> Parser[T]:
-    def rest(accumulator: T) -> Parser[T]:
-        return to_add(pure(accumulator))(
-            to_bind(parser_function)(
-                lambda function: to_bind(parser_value)(lambda value: to_bind(rest(value))(lambda value: pure(function(value)(accumulator)))),
-            ),
-        )
-
-    return to_bind(parser_value)(rest)
+    steps = chained(parser_function, parser_value)
+
+    def folded(cursor: Cursor) -> Option[tuple[T, Cursor]]:
+        match parser_value(cursor):
+            case None:
+                return None
+            case felis.option.Some((first, cursor)):
+                match steps(cursor):
+                    case None:
+                        return None
+                    case felis.option.Some((pairs, cursor)):
+                        values = [first, *(value for _, value in pairs)]
+                        result = values.pop()
+                        for (function, _), value in zip(reversed(pairs), reversed(values), strict=True):
+                            result = function(result)(value)
+                        return felis.option.Some((result, cursor))
+
+    return described(Grammar("chain_right_1", (parser_function, parser_value), chain_right_1))(folded)
 
 
 @curry
 @curry
 def chain_left[R, T](parser_value: Parser[T], parser_function: Parser[Callable[[T], Callable[[R], R]]], accumulator: R) -> Parser[R]:
-    return to_add(pure(accumulator))(
-        to_bind(parser_function)(lambda function: to_bind(parser_value)(lambda value: chain_left(function(value)(accumulator))(parser_function)(parser_value))),
-    )
+    steps = chained(parser_function, parser_value)
+
+    def folded(cursor: Cursor) -> Option[tuple[R, Cursor]]:
+        match steps(cursor):
+            case None:
+                return None
+            case felis.option.Some((pairs, cursor)):
+                result = accumulator
+                for function, value in pairs:
+                    result = function(value)(result)
+                return felis.option.Some((result, cursor))
+
+    return described(Grammar("chain_left", (accumulator, parser_function, parser_value), chain_left))(folded)
 
 
 @curry
 def chain_left_1[T](parser: Parser[T], function: Parser[Callable[[T], Callable[[T], T]]]) -> Parser[T]:
-    return to_bind(parser)(lambda first: chain_left(first)(function)(parser))
+    steps = chained(function, parser)
+
+    def folded(cursor: Cursor) -> Option[tuple[T, Cursor]]:
+        match parser(cursor):
+            case None:
+                return None
+            case felis.option.Some((result, cursor)):
+                match steps(cursor):
+                    case None:
+                        return None
+                    case felis.option.Some((pairs, cursor)):
+                        for operator, value in pairs:
+                            result = operator(value)(result)
+                        return felis.option.Some((result, cursor))
+
+    return described(Grammar("chain_left_1", (function, parser), chain_left_1))(folded)
+
+
+class Operators[T]:
+    def __init__(
+        self,
+        *,
+        prefix: Iterable[tuple[Parser[Callable[[T], T]], int]] = (),
+        postfix: Iterable[tuple[Parser[Callable[[T], T]], int]] = (),
+        infix_left: Iterable[tuple[Parser[Callable[[T], Callable[[T], T]]], int]] = (),
+        infix_right: Iterable[tuple[Parser[Callable[[T], Callable[[T], T]]], int]] = (),
+    ):
+        self.prefix: Final = tuple(prefix)
+        self.postfix: Final = tuple(postfix)
+        self.infix_left: Final = tuple(infix_left)
+        self.infix_right: Final = tuple(infix_right)
+
+
+type Operator = tuple[Any, int, bool]
+
+
+def operator_of(power: int, left: bool) -> Callable[[Any], Operator]:
+    def tagged(function: Any) -> Operator:
+        return function, power, left
+
+    return tagged
+
+
+def operator_choice(operators: Iterable[tuple[Parser[Any], int]], left: bool) -> Parser[Operator]:
+    return reduce(lambda choice, operator: add_to(choice)(map_by(operator_of(operator[1], left))(operator[0])), operators, neutral)
+
+
+def collapse(values: list[Any], pending: list[tuple[Any, int, bool]], power: int | None, left: bool) -> None:
+    while pending and (power is None or pending[-1][1] > power or (left and pending[-1][1] == power)):
+        function, _, binary = pending.pop()
+        value = values.pop()
+        if binary:
+            values[-1] = function(value)(values[-1])
+        else:
+            values.append(function(value))
+
+
+# [T : *] -> Operators T -> Parser T -> Parser T
+@curry
+def precedence[T](operand: Parser[T], operators: Operators[T]) -> Parser[T]:
+    prefixes = many(operator_choice(operators.prefix, False))
+    postfixes = many(operator_choice(operators.postfix, True))
+    infix = add_to(operator_choice(operators.infix_left, True))(operator_choice(operators.infix_right, False))
+
+    def climbed(cursor: Cursor) -> Option[tuple[T, Cursor]]:
+        values: list[Any] = []
+        pending: list[tuple[Any, int, bool]] = []
+        backtrack = cursor, 0
+        while True:
+            match prefixes(cursor):
+                case None:
+                    return None
+                case felis.option.Some((prefixed, cursor)):
+                    pending.extend((function, power, False) for function, power, _ in prefixed)
+            match chosen(operand, cursor):
+                case None, False if values:
+                    cursor, depth = backtrack
+                    del pending[depth:]
+                    break
+                case None, _:
+                    return None
+                case felis.option.Some((value, cursor)), _:
+                    values.append(value)
+            match postfixes(cursor):
+                case None:
+                    return None
+                case felis.option.Some((postfixed, cursor)):
+                    for function, power, _ in postfixed:
+                        collapse(values, pending, power, True)
+                        values[-1] = function(values[-1])
+            before = cursor
+            match chosen(infix, cursor):
+                case None, False:
+                    break
+                case None, True:
+                    return None
+                case felis.option.Some(((function, power, left), cursor)), _:
+                    collapse(values, pending, power, left)
+                    backtrack = before, len(pending)
+                    pending.append((function, power, True))
+        collapse(values, pending, None, True)
+        return felis.option.Some((values[0], cursor))
+
+    return described(Grammar("precedence", (operators, operand), precedence))(climbed)
 
 
 digit = satisfies(str.isdigit)
@@ -380,3 +1436,548 @@ alpha = satisfies(str.isalpha)
 
 
 alnum = satisfies(str.isalnum)
+
+
+skip_spaces = map_by(function.pure(None))(take_while(str.isspace))
+
+
+class Extent:
+    def __init__(self, lookahead: int | None, reach: int | None, examined: Callable[[str, int, int], int]):
+        self.lookahead: Final = lookahead
+        self.reach: Final = reach
+        self.examined: Final = examined
+
+
+def bounded_extent(lookahead: int, reach: int) -> Extent:
+    def examined(string: str, start: int, end: int) -> int:
+        return start + reach if end < 0 else end + lookahead
+
+    return Extent(lookahead, reach, examined)
+
+
+opaque_extent = Extent(None, None, examined_through_end)
+
+
+def regex_extent(lookahead: int | None) -> Extent:
+    return opaque_extent if lookahead is None else Extent(lookahead, None, partial(examined_past, lookahead, examined_through_end))
+
+
+def extent_of(lookahead: int | None, reach: int | None, examined: Callable[[str, int, int], int], *operands: "Fusion") -> Extent:
+    if builtins.any(operand.extent is opaque_extent for operand in operands):
+        return opaque_extent
+    if lookahead is None or reach is None:
+        return Extent(lookahead, reach, examined if lookahead is None else partial(examined_past, lookahead, examined))
+    return bounded_extent(lookahead, reach)
+
+
+def examined_past(lookahead: int, examined: Callable[[str, int, int], int], string: str, start: int, end: int) -> int:
+    return examined(string, start, end) if end < 0 else end + lookahead
+
+
+def furthest(*bounds: int | None) -> int | None:
+    known = [bound for bound in bounds if bound is not None]
+    return max(known, default=0) if len(known) == len(bounds) else None
+
+
+class Fusion:
+    def __init__(self, pattern: str, build: Callable[[str, int, int], Any], width: int | None, extent: Extent):
+        self.pattern: Final = pattern
+        self.build: Final = build
+        self.width: Final = width
+        self.extent: Final = extent
+
+    @cached_property
+    def compiled(self) -> re.Pattern[str]:
+        return re.compile(self.pattern)
+
+
+def matched_text(string: str, start: int, end: int) -> str:
+    return string[start:end]
+
+
+character_classes: dict[Predicate[str], str] = {
+    str.isascii: r"[\x00-\x7f]",
+    str.isalnum: r"[^\W_]",
+    str.isdecimal: r"\d",
+    str.isspace: r"\s",
+}
+
+
+enumerable_predicates: tuple[Predicate[str], ...] = (str.isalpha, str.isdigit, str.islower, str.isnumeric, str.isprintable, str.isupper)
+
+
+def enumerated_class(predicate: Predicate[str]) -> str:
+    ranges: list[str] = []
+    start = None
+    for code in range(sys.maxunicode + 2):
+        if code <= sys.maxunicode and predicate(chr(code)):
+            start = code if start is None else start
+        elif start is not None:
+            ranges.append(re.escape(chr(start)) if start == code - 1 else f"{re.escape(chr(start))}-{re.escape(chr(code - 1))}")
+            start = None
+    return f"[{''.join(ranges)}]" if ranges else "(?!)"
+
+
+def character_class(predicate: Predicate[str]) -> Option[str]:
+    if predicate not in character_classes:
+        if predicate not in enumerable_predicates:
+            return None
+        character_classes[predicate] = enumerated_class(predicate)
+    return felis.option.Some(character_classes[predicate])
+
+
+def characters_class(characters: str, *, negated: bool) -> str:
+    if not characters:
+        return r"(?s:.)" if negated else "(?!)"
+    return f"[{'^' if negated else ''}{''.join(map(re.escape, characters))}]"
+
+
+class_extents = {"": bounded_extent(0, 1), "*+": bounded_extent(1, 0), "++": bounded_extent(1, 1)}
+
+
+@curry
+def fused_class(pattern: str, quantifier: str) -> Fusion:
+    return Fusion(pattern + quantifier, matched_text, None if quantifier else 1, class_extents[quantifier])
+
+
+def alternative_extent(augend: Fusion, addend: Fusion) -> Extent:
+    def examined(string: str, start: int, end: int) -> int:
+        matched = augend.compiled.match(string, start)
+        if matched is not None:
+            return augend.extent.examined(string, start, matched.end())
+        return max(augend.extent.examined(string, start, failed), addend.extent.examined(string, start, end))
+
+    lookahead = furthest(augend.extent.lookahead, addend.extent.lookahead, augend.extent.reach)
+    return extent_of(lookahead, furthest(augend.extent.reach, addend.extent.reach), examined, augend, addend)
+
+
+def sequence_extent(first: Fusion, second: Fusion) -> Extent:
+    def examined(string: str, start: int, end: int) -> int:
+        if end >= 0:
+            middle = sequence_middle(first, second, string, start, end)
+            return max(first.extent.examined(string, start, middle), second.extent.examined(string, middle, end))
+        matched = first.compiled.match(string, start)
+        if matched is None:
+            return first.extent.examined(string, start, failed)
+        return max(first.extent.examined(string, start, matched.end()), second.extent.examined(string, matched.end(), failed))
+
+    trailing = first.extent.lookahead
+    if trailing is not None and second.width is not None:
+        trailing = max(trailing - second.width, 0)
+    following = furthest(first.extent.lookahead, second.extent.reach)
+    reach = None if first.width is None or following is None else furthest(first.extent.reach, first.width + following)
+    return extent_of(furthest(trailing, second.extent.lookahead), reach, examined, first, second)
+
+
+def repetition_extent(parser: Fusion, quantifier: str) -> Extent:
+    def examined(string: str, start: int, end: int) -> int:
+        extent, offset = start, start
+        while (matched := parser.compiled.match(string, offset)) is not None and matched.end() > offset:
+            extent = max(extent, parser.extent.examined(string, offset, matched.end()))
+            offset = matched.end()
+        return max(extent, parser.extent.examined(string, offset, failed if matched is None else offset))
+
+    reach = 0 if quantifier == "*+" else parser.extent.reach
+    return extent_of(furthest(parser.extent.lookahead, parser.extent.reach), reach, examined, parser)
+
+
+def optional_extent(parser: Fusion) -> Extent:
+    def examined(string: str, start: int, end: int) -> int:
+        matched = parser.compiled.match(string, start)
+        return parser.extent.examined(string, start, failed if matched is None else matched.end())
+
+    return extent_of(furthest(parser.extent.lookahead, parser.extent.reach), 0, examined, parser)
+
+
+def sequence_middle(first: Fusion, second: Fusion, string: str, start: int, end: int) -> int:
+    if first.width is not None:
+        return start + first.width
+    if second.width is not None:
+        return end - second.width
+    matched = first.compiled.match(string, start)
+    return end if matched is None else matched.end()
+
+
+def repetitions(parser: Fusion, string: str, start: int, end: int) -> list[Any]:
+    if parser.width == 1 and parser.build is matched_text:
+        return list(string[start:end])
+    values: list[Any] = []
+    while start < end and (matched := parser.compiled.match(string, start)) is not None and matched.end() > start:
+        values.append(parser.build(string, start, matched.end()))
+        start = matched.end()
+    return values
+
+
+@curry
+def fused_to_add(addend: Fusion, augend: Fusion) -> Fusion:
+    def build(string: str, start: int, end: int) -> Any:
+        return (augend if augend.compiled.match(string, start) is not None else addend).build(string, start, end)
+
+    width = augend.width if augend.width == addend.width else None
+    pattern = f"(?>{augend.pattern}|{addend.pattern})"
+    return Fusion(pattern, matched_text if augend.build is addend.build is matched_text else build, width, alternative_extent(augend, addend))
+
+
+@curry
+def fused_to_apply(parser_value: Fusion, parser_function: Fusion) -> Fusion:
+    def build(string: str, start: int, end: int) -> Any:
+        middle = sequence_middle(parser_function, parser_value, string, start, end)
+        return parser_function.build(string, start, middle)(parser_value.build(string, middle, end))
+
+    width = None if parser_function.width is None or parser_value.width is None else parser_function.width + parser_value.width
+    return Fusion(parser_function.pattern + parser_value.pattern, build, width, sequence_extent(parser_function, parser_value))
+
+
+@curry
+def fused_map_by(parser: Fusion, function: Callable[[Any], Any]) -> Fusion:
+    return Fusion(parser.pattern, lambda string, start, end: function(parser.build(string, start, end)), parser.width, parser.extent)
+
+
+@curry
+def fused_many(parser: Fusion, quantifier: str) -> Fusion:
+    build = partial(repetitions, parser)
+    return Fusion(f"(?:{parser.pattern}){quantifier}", build, None, repetition_extent(parser, quantifier))
+
+
+@curry
+def fused_many_into(parser: Fusion, monoid: Monoid[Any]) -> Fusion:
+    def build(string: str, start: int, end: int) -> Any:
+        accumulator = felis.monoid.neutral(monoid)
+        for value in repetitions(parser, string, start, end):
+            accumulator = felis.monoid.add_to(monoid)(accumulator)(value)
+        return accumulator
+
+    return Fusion(f"(?:{parser.pattern})*+", build, None, repetition_extent(parser, "*+"))
+
+
+def fused_recognize(parser: Fusion) -> Fusion:
+    return Fusion(parser.pattern, matched_text, parser.width, parser.extent)
+
+
+def fused_option(parser: Fusion) -> Fusion:
+    def build(string: str, start: int, end: int) -> Option[Any]:
+        return None if parser.compiled.match(string, start) is None else felis.option.Some(parser.build(string, start, end))
+
+    return Fusion(f"(?:{parser.pattern})?+", build, 0 if parser.width == 0 else None, optional_extent(parser))
+
+
+@curry
+def fused_separated_by(parser: Fusion, separator: Fusion) -> Fusion:
+    def build(string: str, start: int, end: int) -> list[Any]:
+        values: list[Any] = []
+        while (matched := parser.compiled.match(string, start)) is not None:
+            values.append(parser.build(string, start, matched.end()))
+            start = matched.end()
+            if start >= end or (separated := separator.compiled.match(string, start)) is None:
+                break
+            start = separated.end()
+        return values
+
+    width = None if separator.width is None or parser.width is None else separator.width + parser.width
+    following = Fusion(separator.pattern + parser.pattern, matched_text, width, sequence_extent(separator, parser))
+    rest = Fusion(f"(?:{following.pattern})*+", matched_text, None, repetition_extent(following, "*+"))
+    pattern = f"(?:{parser.pattern}{rest.pattern})?+"
+    return Fusion(pattern, build, None, optional_extent(Fusion(parser.pattern + rest.pattern, matched_text, None, sequence_extent(parser, rest))))
+
+
+def fusion_of(parser: Parser[Any], fusions: dict[Parser[Any], Option[Fusion]]) -> Option[Fusion]:
+    if parser not in fusions:
+        fusions[parser] = None
+        match grammar_of(parser):
+            case None:
+                pass
+            case felis.option.Some(grammar):
+                fusions[parser] = felis.option.to_add(composite_fusion(grammar, fusions))(primitive_fusion(grammar))
+    return fusions[parser]
+
+
+def fused_texts(texts: tuple[str, ...]) -> Fusion:
+    if not texts:
+        return Fusion("(?!)", matched_text, None, bounded_extent(0, 0))
+    longest, shortest = max(map(len, texts)), min(map(len, texts))
+    pattern = f"(?>{'|'.join(map(re.escape, sorted(texts, key=len, reverse=True)))})"
+    return Fusion(pattern, matched_text, None, bounded_extent(longest - shortest, longest))
+
+
+quantifiers = {"many": "*+", "satisfies": "", "some": "++", "take_while": "*+", "take_while_1": "++"}
+
+
+def primitive_fusion(grammar: Grammar) -> Option[Fusion]:
+    match grammar:
+        case Grammar("any", ()):
+            fusion = felis.option.Some(Fusion(r"(?s:.)", matched_text, 1, bounded_extent(0, 1)))
+        case Grammar("end", ()):
+            fusion = felis.option.Some(Fusion(r"\Z", lambda string, start, end: None, 0, bounded_extent(1, 1)))
+        case Grammar("neutral", ()):
+            fusion = felis.option.Some(Fusion("(?!)", matched_text, 0, bounded_extent(0, 0)))
+        case Grammar("pure", (value,)):
+            fusion = felis.option.Some(Fusion("", lambda string, start, end: value, 0, bounded_extent(0, 0)))
+        case Grammar("character" | "text", (string,)):
+            fusion = felis.option.Some(Fusion(re.escape(string), matched_text, len(string), bounded_extent(0, len(string))))
+        case Grammar("one_of_texts", (texts,)):
+            fusion = felis.option.Some(fused_texts(texts))
+        case Grammar("one_of" | "none_of" as combinator, (characters,)):
+            fusion = felis.option.Some(Fusion(characters_class(characters, negated=combinator == "none_of"), matched_text, 1, bounded_extent(0, 1)))
+        case Grammar("satisfies" | "take_while" | "take_while_1" as combinator, (predicate,)):
+            fusion = felis.option.map_by(fused_class(quantifiers[combinator]))(character_class(predicate))
+        case Grammar("regex", (compiled, lookahead)) if compiled.groups == 0 and compiled.flags == re.UNICODE:
+            fusion = felis.option.Some(Fusion(f"(?>{compiled.pattern})", matched_text, None, regex_extent(lookahead)))
+        case _:
+            fusion = None
+    return fusion
+
+
+def composite_fusion(grammar: Grammar, fusions: dict[Parser[Any], Option[Fusion]]) -> Option[Fusion]:
+    def fused(parser: Parser[Any]) -> Option[Fusion]:
+        return fusion_of(parser, fusions)
+
+    match grammar:
+        case Grammar("to_add", (addend, augend)):
+            fusion = felis.option.lift(fused_to_add)(fused(augend))(fused(addend))
+        case Grammar("to_apply", (parser_function, parser_value)):
+            fusion = felis.option.lift(fused_to_apply)(fused(parser_function))(fused(parser_value))
+        case Grammar("map_by", (function, parser)):
+            fusion = felis.option.map_by(fused_map_by(function))(fused(parser))
+        case Grammar("some", (parser,)) if first_of(parser).nullable:
+            fusion = None
+        case Grammar("many" | "some" as combinator, (parser,)):
+            fusion = felis.option.map_by(fused_many(quantifiers[combinator]))(fused(parser))
+        case Grammar("many_into", (monoid, parser)):
+            fusion = felis.option.map_by(fused_many_into(monoid))(fused(parser))
+        case Grammar("option", (parser,)):
+            fusion = felis.option.map_by(fused_option)(fused(parser))
+        case Grammar("recognize", (parser,)):
+            fusion = felis.option.map_by(fused_recognize)(fused(parser))
+        case Grammar("separated_by", (separator, parser)):
+            fusion = felis.option.lift(fused_separated_by)(fused(separator))(fused(parser))
+        case Grammar("memoize" | "fused", (parser,)):
+            fusion = fused(parser)
+        case Grammar("ref", (reference,)) if reference.target is not neutral:
+            fusion = fused(reference.target)
+        case _:
+            fusion = None
+    return fusion
+
+
+def fused_parser[T](fusion: Fusion, parser: Parser[T]) -> Parser[T]:
+    compiled, build, examined = fusion.compiled, fusion.build, fusion.extent.examined
+
+    def matching(string: str, start: int, slot: Slot) -> int:
+        match pattern_match(compiled, string, start, examined):
+            case None:
+                return failed
+            case matched:
+                end = matched.end()
+                slot.value = build(string, start, end)
+                return end
+
+    return described(Grammar("fused", (parser,)))(stepped(matching))
+
+
+class First:
+    def __init__(self, admits: Predicate[str], nullable: bool, characters: frozenset[str] | None = None):
+        self.admits: Final = admits
+        self.nullable: Final = nullable
+        self.characters: Final = characters
+
+
+unknown_first = First(felis.predicate.true, True)
+
+
+firsts: WeakKeyDictionary[Parser[Any], First] = WeakKeyDictionary()
+
+
+def either_admits(first: First, second: First) -> Predicate[str]:
+    if felis.predicate.true in (first.admits, second.admits):
+        return felis.predicate.true
+    return felis.predicate.either_or(first.admits)(second.admits)
+
+
+def either_characters(first: First, second: First) -> frozenset[str] | None:
+    if first.characters is None or second.characters is None:
+        return None
+    return first.characters | second.characters
+
+
+def first_choice(first: First, second: First) -> First:
+    return First(either_admits(first, second), first.nullable or second.nullable, either_characters(first, second))
+
+
+def first_sequence(first: First, second: First) -> First:
+    return first if not first.nullable else First(either_admits(first, second), second.nullable, either_characters(first, second))
+
+
+def first_repeated(first: First) -> First:
+    return First(first.admits, True, first.characters)
+
+
+def first_of(parser: Parser[Any]) -> First:
+    if parser not in firsts:
+        firsts[parser] = unknown_first
+        match grammar_of(parser):
+            case None:
+                pass
+            case felis.option.Some(grammar):
+                firsts[parser] = felis.option.default_to(unknown_first)(felis.option.to_add(composite_first(grammar))(primitive_first(grammar)))
+    return firsts[parser]
+
+
+def primitive_first(grammar: Grammar) -> Option[First]:
+    match grammar:
+        case Grammar("any", ()):
+            first = felis.option.Some(First(felis.predicate.true, False))
+        case Grammar("end" | "pure" | "cut", _):
+            first = felis.option.Some(First(felis.predicate.false, True, frozenset()))
+        case Grammar("neutral", ()):
+            first = felis.option.Some(First(felis.predicate.false, False, frozenset()))
+        case Grammar("character" | "text", (string,)):
+            first = felis.option.Some(First(string[0].__eq__, False, frozenset(string[0])) if string else First(felis.predicate.false, True, frozenset()))
+        case Grammar("one_of", (characters,)):
+            first = felis.option.Some(First(characters.__contains__, False, frozenset(characters)))
+        case Grammar("one_of_texts", (texts,)):
+            children = trie_of(texts).children
+            first = felis.option.Some(First(children.__contains__, "" in texts, frozenset(children)))
+        case Grammar("none_of", (characters,)):
+            first = felis.option.Some(First(felis.predicate.negate(characters.__contains__), False))
+        case Grammar("satisfies" | "take_while" | "take_while_1" as combinator, (predicate,)):
+            first = felis.option.Some(First(predicate, combinator == "take_while"))
+        case _:
+            first = None
+    return first
+
+
+def composite_first(grammar: Grammar) -> Option[First]:
+    match grammar:
+        case Grammar("to_add", (addend, augend)):
+            first = felis.option.Some(first_choice(first_of(augend), first_of(addend)))
+        case Grammar("to_apply", (parser_function, parser_value)):
+            first = felis.option.Some(first_sequence(first_of(parser_function), first_of(parser_value)))
+        case Grammar("map_by" | "named", (_, parser)) | Grammar("some" | "memoize" | "left_recursive" | "fused" | "predicted" | "compiled", (parser,)):
+            first = felis.option.Some(first_of(parser))
+        case Grammar("recognize", (parser,)):
+            first = felis.option.Some(first_of(parser))
+        case Grammar("chain_left_1" | "chain_right_1", (parser_function, parser_value)):
+            first = felis.option.Some(first_sequence(first_of(parser_value), first_repeated(first_sequence(first_of(parser_function), first_of(parser_value)))))
+        case Grammar("chain_left" | "chain_right", (_, parser_function, parser_value)):
+            first = felis.option.Some(first_repeated(first_sequence(first_of(parser_function), first_of(parser_value))))
+        case Grammar("separated_by", (separator, parser)):
+            first = felis.option.Some(first_repeated(first_sequence(first_of(parser), first_sequence(first_of(separator), first_of(parser)))))
+        case Grammar("many" | "option", (parser,)) | Grammar("many_into", (_, parser)):
+            first = felis.option.Some(first_repeated(first_of(parser)))
+        case Grammar("ref", (reference,)) if reference.target is not neutral:
+            first = felis.option.Some(first_of(reference.target))
+        case Grammar("join", (parser,)) if not first_of(parser).nullable:
+            first = felis.option.Some(first_of(parser))
+        case Grammar("precedence", (operators, operand)):
+            first = felis.option.Some(reduce(first_choice, (first_of(operator) for operator, _ in operators.prefix), first_of(operand)))
+        case _:
+            first = None
+    return first
+
+
+def alternatives_of(parser: Parser[Any]) -> list[Parser[Any]]:
+    match grammar_of(parser):
+        case felis.option.Some(Grammar("to_add", (addend, augend))):
+            return [augend, *alternatives_of(addend)]
+        case felis.option.Some(Grammar("predicted", (chain,))):
+            return alternatives_of(chain)
+        case _:
+            return [parser]
+
+
+def predicted[T](parser: Parser[T]) -> Parser[T]:
+    alternatives = tuple(alternatives_of(parser))
+    predictions = tuple(zip(alternatives, map(first_of, alternatives), strict=True))
+    if builtins.all(first.nullable or first.admits is felis.predicate.true for _, first in predictions):
+        return parser
+    steps = tuple(map(scoped_step, alternatives))
+    candidates: dict[str, tuple[Step, ...]] = {}
+
+    def predicting(string: str, offset: int, slot: Slot) -> int:
+        if offset < len(string):
+            current = string[offset]
+            if current not in candidates:
+                candidates[current] = tuple(step for step, (_, first) in zip(steps, predictions, strict=True) if first.nullable or first.admits(current))
+            possible = candidates[current]
+            examine(string, offset + 1)
+        else:
+            possible = steps
+        for step in possible:
+            end = step(string, offset, slot)
+            if end >= 0:
+                return end
+            discard_from(offset)
+            if end != failed:
+                return failed
+        fail_at(string, offset)
+        return failed
+
+    prediction: Parser[T] = described(Grammar("predicted", (parser,), predicted))(stepped(predicting))
+    vars(prediction)["dispatch"] = steps, candidates
+    return prediction
+
+
+primitive_combinators = frozenset(
+    {"any", "character", "end", "fused", "neutral", "none_of", "one_of", "one_of_texts", "predicted", "pure", "ref", "regex", "satisfies", "text"},
+)
+
+
+def optimized(parser: Parser[Any], fusions: dict[Parser[Any], Option[Fusion]], optimizations: dict[Parser[Any], Parser[Any]]) -> Parser[Any]:
+    if parser not in optimizations:
+        optimizations[parser] = parser
+        match grammar_of(parser), fusion_of(parser, fusions):
+            case felis.option.Some(Grammar(combinator)), felis.option.Some(fusion) if combinator not in primitive_combinators:
+                optimizations[parser] = fused_parser(fusion, parser)
+            case felis.option.Some(Grammar("ref", (reference,))), _ if reference.target is not neutral:
+                optimizations[parser] = ref()
+                define(optimizations[parser])(optimized(reference.target, fusions, optimizations))
+            case felis.option.Some(Grammar(combinator, operands, constructor)), _ if combinator not in primitive_combinators and constructor is not None:
+                optimized_operands = tuple(optimized(operand, fusions, optimizations) if grammar_of(operand) is not None else operand for operand in operands)
+                if builtins.any(operand is not optimized_operand for operand, optimized_operand in zip(operands, optimized_operands, strict=True)):
+                    optimizations[parser] = reduce(lambda function, operand: function(operand), optimized_operands, constructor)
+                if combinator == "to_add":
+                    optimizations[parser] = predicted(optimizations[parser])
+            case _:
+                pass
+    return optimizations[parser]
+
+
+def optimize[T](parser: Parser[T]) -> Parser[T]:
+    return optimized(parser, {}, {})
+
+
+def parser_operands(grammar: Grammar) -> tuple[Parser[Any], ...] | None:
+    match grammar:
+        case Grammar("to_add" | "to_apply" | "separated_by" | "chain_left_1" | "chain_right_1", operands):
+            parsers = operands
+        case Grammar("chain_left" | "chain_right", (_, parser_function, parser_value)):
+            parsers = parser_function, parser_value
+        case Grammar("map_by" | "many_into" | "named", (_, parser)) | Grammar("ref", (Reference(target=parser),)):
+            parsers = (parser,)
+        case Grammar("many" | "some" | "option" | "recognize" | "memoize" | "left_recursive" | "fused" | "predicted" | "compiled", (parser,)):
+            parsers = (parser,)
+        case Grammar("precedence", (operators, operand)):
+            parsers = operand, *(operator for operator, _ in (*operators.prefix, *operators.postfix, *operators.infix_left, *operators.infix_right))
+        case Grammar(combinator, _) if combinator in primitive_combinators | {"take_while", "take_while_1"}:
+            parsers = ()
+        case _:
+            parsers = None
+    return parsers
+
+
+def may_contain(parser: Parser[Any], combinator: str, found: dict[Parser[Any], bool]) -> bool:
+    if parser not in found:
+        found[parser] = False
+        match grammar_of(parser):
+            case felis.option.Some(Grammar(inner, _)) if inner == combinator:
+                found[parser] = True
+            case None:
+                found[parser] = True
+            case felis.option.Some(grammar):
+                operands = parser_operands(grammar)
+                found[parser] = operands is None or builtins.any(may_contain(operand, combinator, found) for operand in operands)
+    return found[parser]
+
+
+def may_cut(parser: Parser[Any], cuts: dict[Parser[Any], bool]) -> bool:
+    return may_contain(parser, "cut", cuts)
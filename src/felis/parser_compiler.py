@@ -0,0 +1,430 @@
+import builtins
+import hashlib
+import importlib.util
+import os
+import pathlib
+import sys
+from typing import Any, Final
+
+import felis.monoid
+import felis.option
+from felis.parser import (
+    Grammar,
+    Parser,
+    Step,
+    alternatives_of,
+    described,
+    first_of,
+    grammar_of,
+    may_contain,
+    may_cut,
+    neutral,
+    regex_extent,
+    step_of,
+    stepped,
+    take_after,
+)
+
+__all__ = [
+    "compile",
+]
+
+
+class Compilation:
+    def __init__(self) -> None:
+        self.constants: Final[list[Any]] = []
+        self.names: Final[dict[int, str]] = {}
+        self.rules: Final[dict[Parser[Any], str]] = {}
+        self.functions: Final[list[list[str]]] = []
+        self.cuts: Final[dict[Parser[Any], bool]] = {}
+        self.named: Final[dict[Parser[Any], bool]] = {}
+        self.lines: list[str] = []
+        self.counter = 0
+
+
+class Site:
+    def __init__(self, indent: int, offset: str, end: str, value: str):
+        self.indent: Final = indent
+        self.offset: Final = offset
+        self.end: Final = end
+        self.value: Final = value
+
+
+compile_depth = 16
+
+
+compile_cache = pathlib.Path(os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")) / "felis"
+
+
+def constant(compilation: Compilation, value: Any) -> str:
+    if id(value) not in compilation.names:
+        compilation.names[id(value)] = f"c{len(compilation.constants)}"
+        compilation.constants.append(value)
+    return compilation.names[id(value)]
+
+
+def fresh(compilation: Compilation, prefix: str) -> str:
+    compilation.counter += 1
+    return f"{prefix}{compilation.counter}"
+
+
+def nested(compilation: Compilation, site: Site, offset: str, depth: int = 0) -> Site:
+    return Site(site.indent + depth, offset, fresh(compilation, "e"), fresh(compilation, "v"))
+
+
+def emit(compilation: Compilation, indent: int, *lines: str) -> None:
+    compilation.lines.extend("    " * indent + line for line in lines)
+
+
+def cut_free(compilation: Compilation, *parsers: Parser[Any]) -> bool:
+    return not builtins.any(may_cut(parser, compilation.cuts) for parser in parsers)
+
+
+def unnamed(compilation: Compilation, *parsers: Parser[Any]) -> bool:
+    return not builtins.any(may_contain(parser, "named", compilation.named) for parser in parsers)
+
+
+def emit_failure(compilation: Compilation, site: Site, width: str) -> None:
+    emit(
+        compilation,
+        site.indent,
+        "if memo is not None:",
+        f"    if {site.offset} > memo.failure: memo.failure = {site.offset}",
+        f"    if {site.offset} + {width} > memo.examined: memo.examined = {site.offset} + {width}",
+        f"{site.end} = -1",
+    )
+
+
+def emit_examine(compilation: Compilation, indent: int, extent: str) -> None:
+    emit(compilation, indent, f"if memo is not None and {extent} > memo.examined: memo.examined = {extent}")
+
+
+def emit_reach_end(compilation: Compilation, indent: int) -> None:
+    emit(compilation, indent, "if frontier is not None: frontier.reached = True")
+
+
+def emit_call(compilation: Compilation, site: Site, step: str, *, scoped: bool) -> None:
+    call = f"chosen_step({step}, string, {site.offset}, slot)" if scoped else f"{step}(string, {site.offset}, slot)"
+    emit(compilation, site.indent, f"{site.end} = {call}", f"if {site.end} >= 0: {site.value} = slot.value")
+
+
+def emit_attempt(compilation: Compilation, parser: Parser[Any], site: Site) -> bool:
+    if cut_free(compilation, parser):
+        emit_parser(compilation, parser, site)
+        return False
+    emit_call(compilation, site, rule(compilation, parser), scoped=True)
+    return True
+
+
+def emit_satisfies(compilation: Compilation, site: Site, condition: str) -> None:
+    offset = site.offset
+    emit(compilation, site.indent, f"if {offset} < n and {condition}:", f"    {site.value} = string[{offset}]", f"    {site.end} = {offset} + 1", "else:")
+    emit(compilation, site.indent + 1, f"if {offset} >= n:")
+    emit_reach_end(compilation, site.indent + 2)
+    emit_failure(compilation, Site(site.indent + 1, offset, site.end, site.value), "1")
+
+
+def emit_character(compilation: Compilation, grammar: Grammar, site: Site) -> bool:
+    match grammar:
+        case Grammar("character", (character,)):
+            emit_satisfies(compilation, site, f"string[{site.offset}] == {constant(compilation, character)}")
+        case Grammar("one_of", (characters,)):
+            emit_satisfies(compilation, site, f"string[{site.offset}] in {constant(compilation, characters)}")
+        case Grammar("none_of", (characters,)):
+            emit_satisfies(compilation, site, f"string[{site.offset}] not in {constant(compilation, characters)}")
+        case Grammar("satisfies", (predicate,)):
+            emit_satisfies(compilation, site, f"{constant(compilation, predicate)}(string[{site.offset}])")
+        case Grammar("any", ()):
+            emit_satisfies(compilation, site, "True")
+        case _:
+            return False
+    return True
+
+
+def emit_take_while(compilation: Compilation, site: Site, predicate: str, *, at_least_one: bool) -> None:
+    indent, offset, end = site.indent, site.offset, site.end
+    emit(compilation, indent, f"{end} = {offset}", f"while {end} < n and {predicate}(string[{end}]): {end} += 1")
+    emit_examine(compilation, indent, f"{end} + 1")
+    emit(compilation, indent, f"if {end} == n:")
+    emit_reach_end(compilation, indent + 1)
+    if at_least_one:
+        emit(compilation, indent, f"if {end} == {offset}:")
+        emit_failure(compilation, Site(indent + 1, offset, end, site.value), "1")
+        emit(compilation, indent, "else:")
+        indent += 1
+    emit(compilation, indent, f"{site.value} = string[{offset}:{end}]")
+
+
+def emit_text(compilation: Compilation, site: Site, string: str) -> None:
+    literal, offset = constant(compilation, string), site.offset
+    emit(
+        compilation,
+        site.indent,
+        f"if string.startswith({literal}, {offset}):",
+        f"    {site.value} = {literal}",
+        f"    {site.end} = {offset} + {len(string)}",
+        "else:",
+    )
+    emit(compilation, site.indent + 1, f"if n - {offset} < {len(string)} and {literal}.startswith(string[{offset}:]):")
+    emit_reach_end(compilation, site.indent + 2)
+    emit_failure(compilation, Site(site.indent + 1, offset, site.end, site.value), str(len(string)))
+
+
+def emit_end(compilation: Compilation, site: Site) -> None:
+    emit(compilation, site.indent, f"if {site.offset} < n:")
+    emit_failure(compilation, Site(site.indent + 1, site.offset, site.end, site.value), "1")
+    emit(compilation, site.indent, "else:")
+    emit_examine(compilation, site.indent + 1, f"{site.offset} + 1")
+    emit_reach_end(compilation, site.indent + 1)
+    emit(compilation, site.indent + 1, f"{site.value} = None", f"{site.end} = {site.offset}")
+
+
+def emit_primitive(compilation: Compilation, grammar: Grammar, site: Site) -> bool:
+    match grammar:
+        case Grammar("text", (string,)):
+            emit_text(compilation, site, string)
+        case Grammar("take_while" | "take_while_1" as combinator, (predicate,)):
+            emit_take_while(compilation, site, constant(compilation, predicate), at_least_one=combinator == "take_while_1")
+        case Grammar("end", ()):
+            emit_end(compilation, site)
+        case Grammar("regex", (compiled, lookahead)):
+            matched = fresh(compilation, "m")
+            examined = constant(compilation, regex_extent(lookahead).examined)
+            emit(
+                compilation,
+                site.indent,
+                f"{matched} = pattern_match({constant(compilation, compiled)}, string, {site.offset}, {examined})",
+                f"if {matched} is None: {site.end} = -1",
+                f"else: {site.end}, {site.value} = {matched}.end(), {matched}.group()",
+            )
+        case Grammar("pure", (value,)):
+            emit(compilation, site.indent, f"{site.value}, {site.end} = {constant(compilation, value)}, {site.offset}")
+        case Grammar("neutral", ()):
+            emit(compilation, site.indent, f"{site.end} = -1")
+        case _:
+            return emit_character(compilation, grammar, site)
+    return True
+
+
+def emit_sequence(compilation: Compilation, grammar: Grammar, site: Site) -> bool:
+    match grammar:
+        case Grammar("map_by", (function, parser)):
+            inner = nested(compilation, site, site.offset)
+            emit_parser(compilation, parser, Site(site.indent, site.offset, site.end, inner.value))
+            emit(compilation, site.indent, f"if {site.end} >= 0: {site.value} = {constant(compilation, function)}({inner.value})")
+        case Grammar("recognize", (parser,)):
+            inner = nested(compilation, site, site.offset)
+            emit_parser(compilation, parser, Site(site.indent, site.offset, site.end, inner.value))
+            emit(compilation, site.indent, f"if {site.end} >= 0: {site.value} = string[{site.offset}:{site.end}]")
+        case Grammar("to_apply", (parser_function, parser_value)):
+            function = nested(compilation, site, site.offset)
+            emit_parser(compilation, parser_function, function)
+            emit(compilation, site.indent, f"if {function.end} < 0: {site.end} = -1", "else:")
+            argument = nested(compilation, site, function.end, 1)
+            emit_parser(compilation, parser_value, Site(argument.indent, argument.offset, site.end, argument.value))
+            emit(compilation, argument.indent, f"if {site.end} >= 0: {site.value} = {function.value}({argument.value})")
+        case Grammar("join", (parser,)):
+            inner = nested(compilation, site, site.offset)
+            emit_parser(compilation, parser, inner)
+            emit(compilation, site.indent, f"if {inner.end} < 0: {site.end} = -1", "else:")
+            emit_call(compilation, Site(site.indent + 1, inner.end, site.end, site.value), f"step_of({inner.value})", scoped=False)
+        case Grammar("memoize", (parser,)):
+            step = f"memoized_step({constant(compilation, parser)}, {rule(compilation, parser)}, string, {site.offset}, slot)"
+            emit(compilation, site.indent, f"{site.end} = {step}", f"if {site.end} >= 0: {site.value} = slot.value")
+        case Grammar("ref", (reference,)) if reference.target is not neutral:
+            emit_call(compilation, site, rule(compilation, reference.target), scoped=False)
+        case Grammar("compiled", (parser,)):
+            emit_parser(compilation, parser, site)
+        case _:
+            return False
+    return True
+
+
+def emit_repetition(compilation: Compilation, parser: Parser[Any], site: Site, append: str) -> None:
+    item = nested(compilation, site, site.end, 1)
+    emit(compilation, site.indent, "while True:")
+    scoped = emit_attempt(compilation, parser, item)
+    emit(compilation, item.indent, f"if {item.end} < 0 or {item.end} == {site.end}: break", append.format(item.value), f"{site.end} = {item.end}")
+    if scoped:
+        emit(compilation, site.indent, f"if {item.end} == -2: {site.end} = -1")
+
+
+def emit_chain_left(compilation: Compilation, parser_function: Parser[Any], parser_value: Parser[Any], site: Site) -> None:
+    function = nested(compilation, site, site.end, 2)
+    argument = nested(compilation, site, function.end, 2)
+    emit(compilation, site.indent, f"if {site.end} >= 0:", "    while True:")
+    emit_parser(compilation, parser_function, function)
+    emit(compilation, function.indent, f"if {function.end} < 0: break")
+    emit_parser(compilation, parser_value, argument)
+    emit(
+        compilation,
+        argument.indent,
+        f"if {argument.end} < 0 or {argument.end} == {site.end}: break",
+        f"{site.value} = {function.value}({argument.value})({site.value})",
+        f"{site.end} = {argument.end}",
+    )
+
+
+def emit_optional(compilation: Compilation, grammar: Grammar, site: Site) -> bool:
+    match grammar:
+        case Grammar("option", (parser,)):
+            inner = nested(compilation, site, site.offset)
+            emit_attempt(compilation, parser, inner)
+            emit(
+                compilation,
+                site.indent,
+                f"if {inner.end} >= 0: {site.end}, {site.value} = {inner.end}, Some({inner.value})",
+                f"elif {inner.end} == -1: {site.end}, {site.value} = {site.offset}, None",
+                f"else: {site.end} = -1",
+            )
+        case Grammar("separated_by", (separator, parser)):
+            first = nested(compilation, site, site.offset)
+            emit_attempt(compilation, parser, first)
+            emit(compilation, site.indent, f"if {first.end} >= 0:", f"    {site.value}, {site.end} = [{first.value}], {first.end}")
+            emit_repetition(compilation, take_after(separator)(parser), Site(site.indent + 1, site.offset, site.end, site.value), f"{site.value}.append({{}})")
+            emit(compilation, site.indent, f"elif {first.end} == -1: {site.value}, {site.end} = [], {site.offset}", f"else: {site.end} = -1")
+        case Grammar("chain_left", (accumulator, parser_function, parser_value)) if cut_free(compilation, parser_function, parser_value):
+            emit(compilation, site.indent, f"{site.value}, {site.end} = {constant(compilation, accumulator)}, {site.offset}")
+            emit_chain_left(compilation, parser_function, parser_value, site)
+        case Grammar("chain_left_1", (parser_function, parser_value)) if cut_free(compilation, parser_function, parser_value):
+            emit_parser(compilation, parser_value, site)
+            emit_chain_left(compilation, parser_function, parser_value, site)
+        case _:
+            return False
+    return True
+
+
+def emit_choice(compilation: Compilation, parser: Parser[Any], grammar: Grammar, site: Site) -> bool:
+    match grammar:
+        case Grammar("to_add", (addend, augend)):
+            scoped = emit_attempt(compilation, augend, site)
+            emit(compilation, site.indent, f"if {site.end} == -1:")
+            if not unnamed(compilation, augend):
+                emit(compilation, site.indent + 1, f"discard_from({site.offset})")
+            scoped = emit_attempt(compilation, addend, Site(site.indent + 1, site.offset, site.end, site.value)) or scoped
+            if scoped:
+                emit(compilation, site.indent, f"if {site.end} == -2: {site.end} = -1")
+            if not unnamed(compilation, augend, addend):
+                emit(compilation, site.indent, f"if {site.end} == -1: discard_from({site.offset})")
+        case Grammar("many" | "some" as combinator, (inner,)):
+            emit(compilation, site.indent, f"{site.value}, {site.end} = [], {site.offset}")
+            emit_repetition(compilation, inner, site, f"{site.value}.append({{}})")
+            if combinator == "some":
+                emit(compilation, site.indent, f"if not {site.value}: {site.end} = -1")
+        case Grammar("many_into", (monoid, inner)):
+            emit(
+                compilation,
+                site.indent,
+                f"{site.value}, {site.end} = {constant(compilation, felis.monoid.neutral)}({constant(compilation, monoid)}), {site.offset}",
+            )
+            emit_repetition(compilation, inner, site, f"{site.value} = {constant(compilation, felis.monoid.add_to(monoid))}({site.value})({{}})")
+        case Grammar("predicted", (_,)):
+            emit_predicted(compilation, parser, site)
+        case _:
+            return emit_optional(compilation, grammar, site)
+    return True
+
+
+def emit_predicted(compilation: Compilation, parser: Parser[Any], site: Site) -> None:
+    alternatives = alternatives_of(parser)
+    scoped = not cut_free(compilation, *alternatives)
+    steps = f"({''.join(f'{rule(compilation, alternative)}, ' for alternative in alternatives)})"
+    firsts, table = constant(compilation, tuple(map(first_of, alternatives))), constant(compilation, {})
+    possible, step, offset = fresh(compilation, "p"), fresh(compilation, "s"), site.offset
+    emit(
+        compilation,
+        site.indent,
+        f"if {offset} < n:",
+        f"    {possible} = {table}.get(string[{offset}])",
+        f"    if {possible} is None:",
+        f"        admitted = zip({steps}, {firsts}, strict=True)",
+        f"        {possible} = {table}[string[{offset}]] = tuple(step for step, first in admitted if first.nullable or first.admits(string[{offset}]))",
+    )
+    emit_examine(compilation, site.indent + 1, f"{offset} + 1")
+    emit(compilation, site.indent, f"else: {possible} = {steps}", f"{site.end} = -1", f"for {step} in {possible}:")
+    emit_call(compilation, Site(site.indent + 1, offset, site.end, site.value), step, scoped=scoped)
+    if not unnamed(compilation, *alternatives):
+        emit(compilation, site.indent + 1, f"if {site.end} < 0: discard_from({offset})")
+    emit(compilation, site.indent + 1, f"if {site.end} != -1: break")
+    emit(compilation, site.indent, f"if {site.end} == -1:")
+    emit_failure(compilation, Site(site.indent + 1, offset, site.end, site.value), "1")
+    if scoped:
+        emit(compilation, site.indent, f"elif {site.end} == -2: {site.end} = -1")
+
+
+def emit_parser(compilation: Compilation, parser: Parser[Any], site: Site) -> None:
+    match grammar_of(parser):
+        case felis.option.Some(grammar) if site.indent < compile_depth:
+            if emit_primitive(compilation, grammar, site) or emit_sequence(compilation, grammar, site) or emit_choice(compilation, parser, grammar, site):
+                return
+            step = constant(compilation, step_of(parser))
+        case felis.option.Some(_):
+            step = rule(compilation, parser)
+        case None:
+            step = constant(compilation, step_of(parser))
+    emit_call(compilation, site, step, scoped=False)
+
+
+def rule(compilation: Compilation, parser: Parser[Any]) -> str:
+    if parser not in compilation.rules:
+        name = compilation.rules[parser] = fresh(compilation, "r")
+        enclosing, compilation.lines = compilation.lines, []
+        emit(
+            compilation,
+            1,
+            f"def {name}(string, offset, slot):",
+            "    n = len(string)",
+            "    memo = current_memo.get()",
+            "    if memo is not None and memo.string is not string: memo = None",
+            "    frontier = current_frontier.get()",
+        )
+        emit_parser(compilation, parser, Site(2, "offset", "end", "value"))
+        emit(compilation, 2, "if end >= 0: slot.value = value", "return end")
+        compilation.functions.append(compilation.lines)
+        compilation.lines = enclosing
+    return compilation.rules[parser]
+
+
+def compiled_source(parser: Parser[Any]) -> tuple[str, list[Any]]:
+    compilation = Compilation()
+    root = rule(compilation, parser)
+    header = [
+        "from felis.option import Some",
+        "from felis.parser import chosen_step, current_frontier, current_memo, discard_from, memoized_step, pattern_match, step_of",
+        "",
+        "",
+        "def build(constants):",
+        f"    ({''.join(f'c{index}, ' for index in range(len(compilation.constants)))}) = constants",
+    ]
+    body = [line for function in compilation.functions for line in function]
+    return "\n".join([*header, *body, f"    return {root}", ""]), compilation.constants
+
+
+def compiled_module(source: str) -> Any:
+    name = f"felis_compiled_{hashlib.sha256(source.encode()).hexdigest()[:32]}"
+    if name not in sys.modules:
+        path = compile_cache / f"{name}.py"
+        if not path.exists():
+            compile_cache.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_text(source, encoding="utf-8")
+            temporary.replace(path)
+        specification = importlib.util.spec_from_file_location(name, path)
+        if specification is None or specification.loader is None:
+            message = f"cannot load compiled parser {path}"
+            raise ImportError(message)
+        module = importlib.util.module_from_spec(specification)
+        specification.loader.exec_module(module)
+        sys.modules[name] = module
+    return sys.modules[name]
+
+
+def compile[T](parser: Parser[T]) -> Parser[T]:
+    if hasattr(parser, "__dict__") and "compiled" in vars(parser):
+        return vars(parser)["compiled"]
+    source, constants = compiled_source(parser)
+    root: Step = compiled_module(source).build(constants)
+    compiled: Parser[T] = described(Grammar("compiled", (parser,), compile))(stepped(root))
+    if hasattr(parser, "__dict__"):
+        vars(parser)["compiled"] = compiled
+    return compiled
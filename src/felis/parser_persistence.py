@@ -0,0 +1,194 @@
+import builtins
+import hashlib
+import json
+import os
+import pathlib
+import re
+import types
+import unicodedata
+from collections.abc import Iterable
+from typing import Any, cast
+
+import felis.option
+from felis.currying import curry
+from felis.option import Option
+from felis.parser import Parser, Reference, character_classes, enumerable_predicates, grammar_of, optimize, parser_operands
+from felis.predicate import Predicate
+
+__all__ = [
+    "load_grammar",
+    "save_grammar",
+]
+
+
+def verified(signatures: list[Option[str]]) -> Option[list[str]]:
+    values = [signature.value for signature in signatures if signature is not None]
+    return felis.option.Some(values) if len(values) == len(signatures) else None
+
+
+def constant_signature(constant: object, seen: frozenset[int]) -> Option[str]:
+    return code_signature(constant, seen) if isinstance(constant, types.CodeType) else operand_signature(constant, seen)
+
+
+def items_signature(kind: str, items: Iterable[object], seen: frozenset[int], *, ordered: bool) -> Option[str]:
+    match verified([constant_signature(item, seen) for item in items]):
+        case None:
+            return None
+        case felis.option.Some(values):
+            return felis.option.Some(f"{kind}({', '.join(values if ordered else sorted(values))})")
+
+
+def code_signature(code: types.CodeType, seen: frozenset[int]) -> Option[str]:
+    match verified([constant_signature(constant, seen) for constant in code.co_consts]):
+        case None:
+            return None
+        case felis.option.Some(constants):
+            return felis.option.Some(hashlib.sha256(repr((code.co_code, constants, code.co_names)).encode()).hexdigest()[:32])
+
+
+def cell_signature(cell: types.CellType, seen: frozenset[int]) -> Option[str]:
+    try:
+        contents = cell.cell_contents
+    except ValueError:
+        return felis.option.Some("<empty>")
+    return operand_signature(contents, seen)
+
+
+named_callables = (
+    type,
+    types.BuiltinFunctionType,
+    types.MethodDescriptorType,
+    types.WrapperDescriptorType,
+    types.MethodWrapperType,
+    types.ClassMethodDescriptorType,
+)
+
+
+def object_signature(operand: object, seen: frozenset[int]) -> Option[str]:
+    name = f"{getattr(operand, '__module__', None) or 'builtins'}.{getattr(operand, '__qualname__', type(operand).__qualname__)}"
+    if id(operand) in seen:
+        return felis.option.Some(name)
+    seen |= {id(operand)}
+    code = getattr(operand, "__code__", None)
+    if isinstance(code, types.CodeType):
+        parts = [code_signature(code, seen)]
+        parts.extend(operand_signature(default, seen) for default in getattr(operand, "__defaults__", None) or ())
+        parts.extend(cell_signature(cell, seen) for cell in getattr(operand, "__closure__", None) or ())
+    elif isinstance(operand, named_callables):
+        parts = []
+    else:
+        return None
+    bound = getattr(operand, "__self__", None)
+    if bound is not None and not isinstance(bound, types.ModuleType):
+        parts.append(operand_signature(bound, seen))
+    match verified(parts):
+        case None:
+            return None
+        case felis.option.Some(values):
+            return felis.option.Some(f"{name}[{', '.join(values)}]" if values else name)
+
+
+def operand_signature(operand: object, seen: frozenset[int] = frozenset()) -> Option[str]:
+    match operand:
+        case re.Pattern(pattern=str() as pattern, flags=int() as flags):
+            signature = felis.option.Some(f"re.compile({pattern!r}, {flags})")
+        case str() | bytes() | int() | float() | complex() | None:
+            signature = felis.option.Some(f"{operand!r}")
+        case tuple():
+            signature = items_signature("tuple", cast("Iterable[object]", operand), seen, ordered=True)
+        case list():
+            signature = items_signature("list", cast("Iterable[object]", operand), seen, ordered=True)
+        case frozenset() | set():
+            signature = items_signature("set", cast("Iterable[object]", operand), seen, ordered=False)
+        case dict():
+            signature = items_signature("dict", cast("dict[object, object]", operand).items(), seen, ordered=True)
+        case _:
+            signature = object_signature(operand, seen)
+    return signature
+
+
+def graph_of(parser: Parser[Any]) -> tuple[list[Parser[Any]], Option[list[Any]]]:
+    indices = {parser: 0}
+    nodes = [parser]
+    graph: list[Any] = []
+    complete = True
+    for node in nodes:
+        match grammar_of(node):
+            case None:
+                combinator, signatures, children = "function", [operand_signature(node)], ()
+            case felis.option.Some(grammar):
+                children = parser_operands(grammar) or tuple(operand for operand in grammar.operands if grammar_of(operand) is not None)
+                signatures = [
+                    felis.option.Some("parser")
+                    if isinstance(operand, Reference) or builtins.any(operand is child for child in children)
+                    else operand_signature(operand)
+                    for operand in grammar.operands
+                ]
+                combinator = grammar.combinator
+        for child in children:
+            if child not in indices:
+                indices[child] = len(nodes)
+                nodes.append(child)
+        match verified(signatures):
+            case None:
+                complete = False
+            case felis.option.Some(values):
+                graph.append([combinator, values, [indices[child] for child in children]])
+    return nodes, felis.option.Some(graph) if complete else None
+
+
+def dispatch_tables(nodes: list[Parser[Any]]) -> dict[str, dict[str, list[int]]]:
+    tables: dict[str, dict[str, list[int]]] = {}
+    for index, node in enumerate(nodes):
+        if hasattr(node, "__dict__") and "dispatch" in vars(node):
+            steps, candidates = vars(node)["dispatch"]
+            tables[str(index)] = {current: [steps.index(step) for step in possible] for current, possible in candidates.items()}
+    return tables
+
+
+def install_dispatch_tables(nodes: list[Parser[Any]], tables: dict[str, dict[str, list[int]]]) -> None:
+    for index, table in tables.items():
+        steps, candidates = vars(nodes[int(index)])["dispatch"]
+        candidates.update({current: tuple(steps[position] for position in possible) for current, possible in table.items()})
+
+
+def predicate_signatures() -> list[tuple[Predicate[str], felis.option.Some[str]]]:
+    signatures = [(predicate, operand_signature(predicate)) for predicate in enumerable_predicates]
+    return [(predicate, signature) for predicate, signature in signatures if signature is not None]
+
+
+# StrPath -> [T : *] -> Parser T -> None
+@curry
+def save_grammar(parser: Parser[Any], path: str | os.PathLike[str]) -> None:
+    nodes, graph = graph_of(parser)
+    artifacts = {
+        "unicode": unicodedata.unidata_version,
+        "classes": {signature.value: character_classes[predicate] for predicate, signature in predicate_signatures() if predicate in character_classes},
+        "graph": None if graph is None else graph.value,
+        "tables": {} if graph is None else dispatch_tables(nodes),
+    }
+    destination = pathlib.Path(path)
+    temporary = destination.with_name(f"{destination.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(artifacts), encoding="utf-8")
+    temporary.replace(destination)
+
+
+# StrPath -> [T : *] -> Parser T -> Parser T
+@curry
+def load_grammar[T](parser: Parser[T], path: str | os.PathLike[str]) -> Parser[T]:
+    try:
+        artifacts = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return optimize(parser)
+    if artifacts.get("unicode") == unicodedata.unidata_version:
+        for predicate, signature in predicate_signatures():
+            if signature.value in artifacts["classes"]:
+                character_classes.setdefault(predicate, artifacts["classes"][signature.value])
+    optimization = optimize(parser)
+    nodes, graph = graph_of(optimization)
+    match graph:
+        case felis.option.Some(verified_graph) if verified_graph == artifacts.get("graph"):
+            install_dispatch_tables(nodes, artifacts["tables"])
+        case _:
+            pass
+    return optimization
@@ -0,0 +1,214 @@
+import asyncio
+import builtins
+import codecs
+import mmap
+import multiprocessing
+import os
+import pathlib
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
+from itertools import repeat
+from typing import Any, Final, Self
+
+import felis.option
+from felis.coroutine import Coroutine
+from felis.currying import curry
+from felis.option import Option
+from felis.parser import Frontier, Memo, Parser, current_frontier, current_memo, memo_capacity, parse_as, run_step
+
+__all__ = [
+    "Messages",
+    "chunk_size",
+    "parallel_chunks",
+    "parse_file",
+    "parse_mmap",
+    "parse_parallel",
+    "parse_reader",
+    "parse_stream",
+]
+
+
+def attempt[T](parser_value: Parser[T], memo: Memo, offset: int) -> tuple[Option[tuple[T, int]], bool]:
+    frontier = Frontier()
+    memo_token, frontier_token = current_memo.set(memo), current_frontier.set(frontier)
+    try:
+        return run_step(parser_value, memo.string, offset), frontier.reached
+    finally:
+        current_frontier.reset(frontier_token)
+        current_memo.reset(memo_token)
+
+
+def unparsed(offset: int) -> ValueError:
+    return ValueError(f"cannot parse stream record at offset {offset}")
+
+
+def refilled(remaining: Iterator[str], pending: str) -> tuple[str, bool]:
+    pieces, size = [pending], len(pending)
+    for chunk in remaining:
+        pieces.append(chunk)
+        size += len(chunk)
+        if size >= 2 * len(pending):
+            return "".join(pieces), False
+    return "".join(pieces), True
+
+
+# [T : *] -> Parser T -> Iterable str -> Iterator T
+@curry
+def parse_stream[T](chunks: Iterable[str], parser_value: Parser[T]) -> Iterator[T]:
+    remaining = iter(chunks)
+    memo, offset, consumed, exhausted = Memo("", memo_capacity), 0, 0, False
+    while True:
+        result, reached = attempt(parser_value, memo, offset)
+        if reached and not exhausted:
+            string, exhausted = refilled(remaining, memo.string[offset:])
+            memo, offset, consumed = Memo(string, memo_capacity), 0, consumed + offset
+            continue
+        match result:
+            case felis.option.Some((value, end)) if end > offset:
+                yield value
+                offset = end
+            case _ if offset == len(memo.string):
+                return
+            case _:
+                raise unparsed(consumed + offset)
+
+
+class Messages[T]:
+    def __init__(self, reader: asyncio.StreamReader, parser_value: Parser[T]) -> None:
+        self.reader: Final = reader
+        self.parser_value: Final = parser_value
+        self.decoder: Final = codecs.getincrementaldecoder("utf-8")()
+        self.memo = Memo("", memo_capacity)
+        self.offset = 0
+        self.consumed = 0
+        self.exhausted = False
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> T:
+        match await self():
+            case felis.option.Some(value):
+                return value
+            case None:
+                raise StopAsyncIteration
+
+    def __call__(self) -> Coroutine[Option[T]]:
+        return self.next_message()
+
+    async def next_message(self) -> Option[T]:
+        while True:
+            result, reached = attempt(self.parser_value, self.memo, self.offset)
+            if reached and not self.exhausted:
+                data = await self.reader.read(max(chunk_size, len(self.memo.string) - self.offset))
+                self.exhausted = not data
+                string = self.memo.string[self.offset :] + self.decoder.decode(data, final=self.exhausted)
+                self.memo, self.offset, self.consumed = Memo(string, memo_capacity), 0, self.consumed + self.offset
+                continue
+            match result:
+                case felis.option.Some((value, end)) if end > self.offset:
+                    self.offset = end
+                    return felis.option.Some(value)
+                case _ if self.offset == len(self.memo.string):
+                    return None
+                case _:
+                    raise unparsed(self.consumed + self.offset)
+
+
+# [T : *] -> Parser T -> StreamReader -> Messages T
+@curry
+def parse_reader[T](reader: asyncio.StreamReader, parser_value: Parser[T]) -> Messages[T]:
+    return Messages(reader, parser_value)
+
+
+chunk_size = 1 << 16
+
+
+parallel_chunks = 4
+
+
+def decoded_chunks(mapping: mmap.mmap) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for start in range(0, len(mapping), chunk_size):
+        yield decoder.decode(mapping[start : start + chunk_size])
+    yield decoder.decode(b"", final=True)
+
+
+# [T : *] -> Parser T -> mmap -> Iterator T
+@curry
+def parse_mmap[T](mapping: mmap.mmap, parser_value: Parser[T]) -> Iterator[T]:
+    return parse_stream(parser_value)(decoded_chunks(mapping))
+
+
+# [T : *] -> Parser T -> StrPath -> Iterator T
+@curry
+def parse_file[T](path: str | os.PathLike[str], parser_value: Parser[T]) -> Iterator[T]:
+    with pathlib.Path(path).open("rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield from parse_stream(parser_value)(())
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            yield from parse_mmap(parser_value)(mapping)
+
+
+current_record_parser: ContextVar[Parser[Any]] = ContextVar("current_record_parser")
+
+
+def install_record_parser(parser: Parser[Any]) -> None:
+    current_record_parser.set(parser)
+
+
+def records_in(path: str | os.PathLike[str], separator: str, start: int, end: int) -> list[str]:
+    with pathlib.Path(path).open("rb") as file:
+        file.seek(start)
+        records = file.read(end - start).decode("utf-8").split(separator)
+    if records[-1] == "":
+        records.pop()
+    return records
+
+
+def parse_range(path: str | os.PathLike[str], separator: str, start: int, end: int) -> list[Option[Any]]:
+    return list(map(parse_as(current_record_parser.get()), records_in(path, separator, start, end)))
+
+
+def overlaps_itself(separator: bytes) -> bool:
+    return builtins.any(separator[:size] == separator[-size:] for size in range(1, len(separator)))
+
+
+def record_boundaries(mapping: mmap.mmap, separator: bytes, count: int) -> list[int]:
+    overlapping = overlaps_itself(separator)
+    boundaries = [0]
+    for index in range(1, count):
+        target = len(mapping) * index // count
+        found = mapping.find(separator, boundaries[-1] if overlapping else max(target, boundaries[-1]))
+        while overlapping and found != -1 and found < target:
+            found = mapping.find(separator, found + len(separator))
+        if found == -1:
+            break
+        if found + len(separator) > boundaries[-1]:
+            boundaries.append(found + len(separator))
+    if boundaries[-1] < len(mapping):
+        boundaries.append(len(mapping))
+    return boundaries
+
+
+# [T : *] -> int -> str -> Parser T -> StrPath -> Iterator (Option T)
+@curry
+@curry
+@curry
+def parse_parallel[T](path: str | os.PathLike[str], record_parser: Parser[T], separator: str, workers: int) -> Iterator[Option[T]]:
+    with pathlib.Path(path).open("rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            boundaries = record_boundaries(mapping, separator.encode("utf-8"), workers * parallel_chunks)
+    starts, ends = boundaries[:-1], boundaries[1:]
+    if "fork" not in multiprocessing.get_all_start_methods():
+        for start, end in zip(starts, ends, strict=True):
+            yield from map(parse_as(record_parser), records_in(path, separator, start, end))
+        return
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=install_record_parser, initargs=(record_parser,)) as executor:
+        for results in executor.map(parse_range, repeat(path), repeat(separator), starts, ends):
+            yield from results
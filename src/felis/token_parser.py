@@ -0,0 +1,450 @@
+import re
+from array import array
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any, Final
+
+import felis.alternative
+import felis.applicative
+import felis.functor
+import felis.monad
+import felis.option
+import felis.semigroup
+from felis import function, state
+from felis.alternative import Alternative
+from felis.applicative import Applicative
+from felis.currying import curry
+from felis.functor import Functor
+from felis.monad import Monad
+from felis.monoid import Monoid
+from felis.option import Option
+from felis.predicate import Predicate
+from felis.semigroup import Semigroup
+
+__all__ = [
+    "Cursor",
+    "Token",
+    "TokenParser",
+    "Tokens",
+    "add_to",
+    "alternative",
+    "any",
+    "applicative",
+    "apply_to",
+    "bind_to",
+    "bracket",
+    "by_map",
+    "compose_after",
+    "compose_before",
+    "discard_after",
+    "discard_before",
+    "end",
+    "functor",
+    "guard",
+    "join",
+    "kind",
+    "lexer",
+    "lift",
+    "literal",
+    "many",
+    "map_by",
+    "monad",
+    "monoid",
+    "neutral",
+    "option",
+    "parse_as",
+    "pure",
+    "satisfies",
+    "semigroup",
+    "separated_by",
+    "some",
+    "take_after",
+    "take_before",
+    "to_add",
+    "to_apply",
+    "to_bind",
+    "token_at",
+    "when",
+]
+
+
+class Tokens:
+    def __init__(self, string: str, names: tuple[str, ...], kinds: array[int], starts: array[int], ends: array[int]):
+        self.string: Final = string
+        self.names: Final = names
+        self.kinds: Final = kinds
+        self.starts: Final = starts
+        self.ends: Final = ends
+
+
+class Token:
+    __match_args__ = ("kind", "text")
+
+    def __init__(self, kind: str, text: str, start: int, end: int):
+        self.kind: Final = kind
+        self.text: Final = text
+        self.start: Final = start
+        self.end: Final = end
+
+
+def token_at(tokens: Tokens, index: int) -> Token:
+    start, end = tokens.starts[index], tokens.ends[index]
+    return Token(tokens.names[tokens.kinds[index]], tokens.string[start:end], start, end)
+
+
+# Iterable str -> Iterable (str, str) -> str -> Option Tokens
+@curry
+def lexer(rules: Iterable[tuple[str, str]], skipped: Iterable[str]) -> Callable[[str], Option[Tokens]]:
+    rules = tuple(rules)
+    names = tuple(name for name, _ in rules)
+    ignored = frozenset(names.index(name) for name in skipped)
+    master = re.compile("|".join(f"(?P<kind{index}>{pattern})" for index, (_, pattern) in enumerate(rules)))
+    groups = {master.groupindex[f"kind{index}"]: index for index in range(len(rules))}
+
+    def tokenize(string: str) -> Option[Tokens]:
+        kinds, starts, ends = array("H"), array("q"), array("q")
+        offset = 0
+        while offset < len(string):
+            matched = master.match(string, offset)
+            if matched is None or matched.end() == offset or matched.lastindex is None:
+                return None
+            kind = groups[matched.lastindex]
+            if kind not in ignored:
+                kinds.append(kind)
+                starts.append(offset)
+                ends.append(matched.end())
+            offset = matched.end()
+        return felis.option.Some(Tokens(string, names, kinds, starts, ends))
+
+    return tokenize
+
+
+class Cursor:
+    __match_args__ = ("tokens", "offset")
+
+    def __init__(self, tokens: Tokens, offset: int):
+        self.tokens: Final = tokens
+        self.offset: Final = offset
+
+
+type TokenParser[T] = Callable[[Cursor], Option[tuple[T, Cursor]]]
+
+
+@curry
+def parse_as[T](tokens: Tokens, parser_value: TokenParser[T]) -> Option[T]:
+    return state.starting_with_run_t(felis.option.functor)(parser_value)(Cursor(tokens, 0))
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def to_add[T](augend: TokenParser[T], addend: TokenParser[T]) -> TokenParser[T]: ...
+
+else:
+    to_add = felis.option.to_add_t(function.monad)
+
+
+# [T : *] -> Semigroup (TokenParser T)
+semigroup: Semigroup[TokenParser[Any]] = Semigroup(to_add)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def add_to[T](addend: TokenParser[T], augend: TokenParser[T]) -> TokenParser[T]: ...
+
+else:
+    add_to = felis.semigroup.add_to(semigroup)
+
+
+# [T : *] -> TokenParser T
+neutral: TokenParser[Any] = felis.option.neutral_t(function.monad)
+
+
+# [T : *] -> Monoid (TokenParser T)
+monoid = Monoid(semigroup, neutral)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def map_by[From, To](parser_value: TokenParser[From], function: Callable[[From], To]) -> TokenParser[To]: ...
+
+else:
+    map_by = state.map_by_t(felis.option.functor)
+
+
+# Functor TokenParser
+functor = Functor(map_by)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def by_map[From, To](function: Callable[[From], To], parser_value: TokenParser[From]) -> TokenParser[To]: ...
+
+else:
+    by_map = felis.functor.by_map(functor)
+
+
+if TYPE_CHECKING:
+
+    def pure[T](value: T, /) -> TokenParser[T]: ...
+
+else:
+    pure = state.pure_t(felis.option.applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def to_apply[From, To](parser_value: TokenParser[From], parser_function: TokenParser[Callable[[From], To]]) -> TokenParser[To]: ...
+
+else:
+    to_apply = state.to_apply_t(felis.option.monad)
+
+
+# Applicative TokenParser
+applicative = Applicative(functor, pure, to_apply)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def apply_to[From, To](parser_function: TokenParser[Callable[[From], To]], parser_value: TokenParser[From]) -> TokenParser[To]: ...
+
+else:
+    apply_to = felis.applicative.apply_to(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    @curry
+    def lift[First, Second, Result](
+        second: TokenParser[Second],
+        first: TokenParser[First],
+        function: Callable[[First], Callable[[Second], Result]],
+    ) -> TokenParser[Result]: ...
+
+else:
+    lift = felis.applicative.lift(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def take_after[First, Second](second: TokenParser[Second], first: TokenParser[First]) -> TokenParser[Second]: ...
+
+else:
+    take_after = felis.applicative.take_after(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def discard_before[First, Second](first: TokenParser[First], second: TokenParser[Second]) -> TokenParser[Second]: ...
+
+else:
+    discard_before = felis.applicative.discard_before(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def discard_after[First, Second](second: TokenParser[Second], first: TokenParser[First]) -> TokenParser[First]: ...
+
+else:
+    discard_after = felis.applicative.discard_after(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def take_before[First, Second](first: TokenParser[First], second: TokenParser[Second]) -> TokenParser[First]: ...
+
+else:
+    take_before = felis.applicative.take_before(applicative)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def when(parser_none: TokenParser[None], bool: bool) -> TokenParser[None]: ...
+
+else:
+    when = felis.applicative.when(applicative)
+
+
+# Alternative TokenParser
+alternative = Alternative(monoid, applicative)
+
+
+if TYPE_CHECKING:
+
+    def guard(bool: bool, /) -> TokenParser[None]: ...
+
+else:
+    guard = felis.alternative.guard(alternative)
+
+
+if TYPE_CHECKING:
+
+    def join[T](parser_value: TokenParser[TokenParser[T]], /) -> TokenParser[T]: ...
+
+else:
+    join = state.join_t(felis.option.monad)
+
+
+# Monad TokenParser
+monad = Monad(applicative, join)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def bind_to[From, To](parser_value: TokenParser[From], function: Callable[[From], TokenParser[To]]) -> TokenParser[To]: ...
+
+else:
+    bind_to = felis.monad.bind_to(monad)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    def to_bind[From, To](function: Callable[[From], TokenParser[To]], parser_value: TokenParser[From]) -> TokenParser[To]: ...
+
+else:
+    to_bind = felis.monad.to_bind(monad)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    @curry
+    def compose_after[From, Intermediate, To](
+        value: From,
+        second: Callable[[Intermediate], TokenParser[To]],
+        first: Callable[[From], TokenParser[Intermediate]],
+    ) -> TokenParser[To]: ...
+
+else:
+    compose_after = felis.monad.compose_after(monad)
+
+
+if TYPE_CHECKING:
+
+    @curry
+    @curry
+    def compose_before[From, Intermediate, To](
+        value: From,
+        first: Callable[[From], TokenParser[Intermediate]],
+        second: Callable[[Intermediate], TokenParser[To]],
+    ) -> TokenParser[To]: ...
+
+else:
+    compose_before = felis.monad.compose_before(monad)
+
+
+def end(cursor: Cursor) -> Option[tuple[None, Cursor]]:
+    return None if cursor.offset < len(cursor.tokens.kinds) else felis.option.Some((None, cursor))
+
+
+def any(cursor: Cursor) -> Option[tuple[Token, Cursor]]:
+    tokens, offset = cursor.tokens, cursor.offset
+    return felis.option.Some((token_at(tokens, offset), Cursor(tokens, offset + 1))) if offset < len(tokens.kinds) else None
+
+
+def satisfies(predicate: Predicate[Token]) -> TokenParser[Token]:
+    def satisfying(cursor: Cursor) -> Option[tuple[Token, Cursor]]:
+        tokens, offset = cursor.tokens, cursor.offset
+        if offset < len(tokens.kinds) and predicate(current := token_at(tokens, offset)):
+            return felis.option.Some((current, Cursor(tokens, offset + 1)))
+        return None
+
+    return satisfying
+
+
+def kind(name: str) -> TokenParser[Token]:
+    names: tuple[str, ...] = ()
+    index = -1
+
+    def matching(cursor: Cursor) -> Option[tuple[Token, Cursor]]:
+        nonlocal names, index
+        tokens, offset = cursor.tokens, cursor.offset
+        if tokens.names is not names:
+            names, index = tokens.names, tokens.names.index(name) if name in tokens.names else -1
+        if offset < len(tokens.kinds) and tokens.kinds[offset] == index:
+            return felis.option.Some((token_at(tokens, offset), Cursor(tokens, offset + 1)))
+        return None
+
+    return matching
+
+
+def literal(text: str) -> TokenParser[Token]:
+    def matching(cursor: Cursor) -> Option[tuple[Token, Cursor]]:
+        tokens, offset = cursor.tokens, cursor.offset
+        if offset < len(tokens.kinds) and tokens.ends[offset] - tokens.starts[offset] == len(text) and tokens.string.startswith(text, tokens.starts[offset]):
+            return felis.option.Some((token_at(tokens, offset), Cursor(tokens, offset + 1)))
+        return None
+
+    return matching
+
+
+def many[T](parser: TokenParser[T]) -> TokenParser[list[T]]:
+    def repeated(cursor: Cursor) -> Option[tuple[list[T], Cursor]]:
+        values: list[T] = []
+        while True:
+            match parser(cursor):
+                case felis.option.Some((value, following)) if following.offset != cursor.offset:
+                    values.append(value)
+                    cursor = following
+                case _:
+                    return felis.option.Some((values, cursor))
+
+    return repeated
+
+
+def some[T](parser: TokenParser[T]) -> TokenParser[list[T]]:
+    repeated = many(parser)
+
+    def repeated_at_least_once(cursor: Cursor) -> Option[tuple[list[T], Cursor]]:
+        match repeated(cursor):
+            case felis.option.Some(([], _)):
+                return None
+            case values_and_cursor:
+                return values_and_cursor
+
+    return repeated_at_least_once
+
+
+def option[T](parser: TokenParser[T]) -> TokenParser[Option[T]]:
+    return add_to(map_by(felis.option.pure)(parser))(pure(felis.option.neutral))
+
+
+# [S : *] -> TokenParser S -> [T : *] -> TokenParser T -> TokenParser (list T)
+@curry
+def separated_by[T](parser: TokenParser[T], separator: TokenParser[Any]) -> TokenParser[list[T]]:
+    following = take_after(separator)(parser)
+
+    def separated(cursor: Cursor) -> Option[tuple[list[T], Cursor]]:
+        match parser(cursor):
+            case None:
+                return felis.option.Some(([], cursor))
+            case felis.option.Some((first, cursor)):
+                values = [first]
+                while True:
+                    match following(cursor):
+                        case felis.option.Some((value, rest)) if rest.offset != cursor.offset:
+                            values.append(value)
+                            cursor = rest
+                        case _:
+                            return felis.option.Some((values, cursor))
+
+    return separated
+
+
+# [L : *] -> TokenParser L -> [R : *] -> TokenParser R -> [T : *] -> TokenParser T -> TokenParser T
+@curry
+@curry
+def bracket[T](parser: TokenParser[T], right: TokenParser[Any], left: TokenParser[Any]) -> TokenParser[T]:
+    return take_after(left)(take_before(right)(parser))
@@ -0,0 +1,32 @@
+from felis.bytes_parser import Cursor, end, length_prefixed, lift, literal, many, parse_as, structure, take_after, take_before, take_while, unsigned
+from felis.option import Some
+
+
+def test_unsigned_reads_fixed_width_integer_in_byte_order():
+    match parse_as(lift(lambda big: lambda little: (big, little))(unsigned("big")(2))(unsigned("little")(2)))(b"\x01\x02\x01\x02"):
+        case Some(value):
+            assert value == (0x0102, 0x0201)
+        case None:
+            raise AssertionError
+
+
+def test_length_prefixed_returns_view_into_original_buffer():
+    data = bytearray(b"\x03catdog")
+    match length_prefixed(unsigned("big")(1))(Cursor(memoryview(data), 0)):
+        case Some((field, cursor)):
+            data[1] = ord("b")
+            assert (field.tobytes(), cursor.offset) == (b"bat", len(b"\x03cat"))
+        case None:
+            raise AssertionError
+
+
+def test_structure_fails_on_truncated_input():
+    assert parse_as(take_after(literal(b"HDR"))(take_before(end)(structure("<HI"))))(b"HDR\x00\x00") is None
+
+
+def test_many_stops_when_operand_matches_without_consuming():
+    match parse_as(many(take_while(lambda byte: byte == ord("1"))))(b"11x"):
+        case Some(value):
+            assert [field.tobytes() for field in value] == [b"11"]
+        case None:
+            raise AssertionError
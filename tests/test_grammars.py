@@ -0,0 +1,41 @@
+import csv
+import io
+import json
+
+from felis.grammars import arithmetic
+from felis.grammars import csv as csv_grammar
+from felis.grammars import json as json_grammar
+from felis.option import Some
+
+
+def test_json_grammar_agrees_with_standard_library():
+    document = (
+        '{"felis": [1, -2.5e1, true, false, null], "name": "caf\\u00e9 \\"\\ud83d\\udc08\\"\\n", "empty": {}, '
+        '"surrogates": ["\\udc08\\ud83d", "\\ud800", "\\uD83D\\uDC08x\\udbff"]}'
+    )
+    match json_grammar.parse(document):
+        case Some(value):
+            assert value == json.loads(document)
+        case None:
+            raise AssertionError
+
+
+def test_json_grammar_rejects_trailing_separator():
+    assert json_grammar.parse("[1, 2,]") is None
+
+
+def test_csv_grammar_agrees_with_standard_library():
+    document = 'name,notes\r\nfelis,"catus, ""domestic"""\r\nlynx,"two\nlines"\r\n'
+    match csv_grammar.parse(document):
+        case Some(value):
+            assert value == list(csv.reader(io.StringIO(document, newline="")))
+        case None:
+            raise AssertionError
+
+
+def test_arithmetic_grammar_evaluates_expression():
+    match arithmetic.parse("(1+2)*3-8/4"):
+        case Some(value):
+            assert value == (1 + 2) * 3 - 8 / 4
+        case None:
+            raise AssertionError
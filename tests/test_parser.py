@@ -0,0 +1,721 @@
+import asyncio
+import builtins
+import gc
+import json
+import operator
+import re
+import weakref
+from collections.abc import Iterator
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+import felis.list
+import felis.parser
+import felis.parser_compiler
+import felis.parser_stream
+from felis.either import Left
+from felis.option import Option, Some
+from felis.parser import (
+    Cursor,
+    Edit,
+    Memo,
+    Operators,
+    ParseCache,
+    Parser,
+    add_to,
+    alnum,
+    alpha,
+    any,
+    bracket,
+    cached_parse_as,
+    chain_left_1,
+    character,
+    column,
+    commit,
+    define,
+    digit,
+    edited,
+    end,
+    find_all,
+    fix,
+    grammar_of,
+    hit_rate,
+    incremental_parse_as,
+    left_recursive,
+    lift,
+    line,
+    many,
+    many_into,
+    map_by,
+    memoize,
+    named,
+    one_of,
+    one_of_texts,
+    optimize,
+    option,
+    packrat_parse_as,
+    parse_as,
+    parse_as_either,
+    precedence,
+    profiling,
+    pure,
+    recognize,
+    ref,
+    regex,
+    report,
+    satisfies,
+    separated_by,
+    skip_spaces,
+    some,
+    take_after,
+    take_before,
+    take_while,
+    take_while_1,
+    text,
+    to_bind,
+)
+from felis.parser_compiler import compile
+from felis.parser_persistence import load_grammar, save_grammar
+from felis.parser_stream import parse_file, parse_parallel, parse_reader, parse_stream
+
+
+def test_parse_as_returns_none_when_input_does_not_match():
+    assert parse_as(text("cat"))("dog") is None
+
+
+def test_parse_as_returns_value_when_input_matches():
+    match parse_as(take_before(end)(some(digit)))("123"):
+        case Some(value):
+            assert value == ["1", "2", "3"]
+        case None:
+            raise AssertionError
+
+
+def test_any_advances_cursor_offset_without_copying_string():
+    string = "felis"
+    match any(Cursor(string, 2)):
+        case Some((value, cursor)):
+            assert cursor.string is string
+            assert (value, cursor.offset) == ("l", 3)
+        case None:
+            raise AssertionError
+
+
+def test_line_and_column_are_computed_from_offset():
+    cursor = Cursor("ab\ncd\nef", 7)
+    assert (line(cursor), column(cursor)) == (3, 2)
+
+
+def test_many_stops_at_first_mismatch():
+    match many(digit)(Cursor("12a", 0)):
+        case Some((value, cursor)):
+            assert (value, cursor.offset) == (["1", "2"], 2)
+        case None:
+            raise AssertionError
+
+
+def test_memoize_reuses_result_at_same_offset_within_parse():
+    calls: list[int] = []
+
+    def counted(cursor: Cursor) -> Option[tuple[str, Cursor]]:
+        calls.append(cursor.offset)
+        return digit(cursor)
+
+    rule = memoize(counted)
+    assert parse_as(add_to(take_before(text("?"))(rule))(take_before(text("!"))(rule)))("1?") is not None
+    assert calls == [0]
+
+
+def test_memoize_evicts_results_beyond_capacity():
+    calls: list[int] = []
+
+    def counted(cursor: Cursor) -> Option[tuple[str, Cursor]]:
+        calls.append(cursor.offset)
+        return digit(cursor)
+
+    rule = memoize(counted)
+    other = memoize(alpha)
+    assert packrat_parse_as(1)(add_to(rule)(add_to(other)(rule)))("") is None
+    assert calls == [0, 0]
+
+
+def test_left_recursive_rule_associates_to_the_left():
+    number = map_by(int)(digit)
+
+    def difference(cursor: Cursor) -> Option[tuple[int, Cursor]]:
+        return add_to(lift(lambda a: lambda b: a - b)(take_before(text("-"))(subtraction))(number))(number)(cursor)
+
+    subtraction = left_recursive(difference)
+    match parse_as(take_before(end)(subtraction))("9-2-3"):
+        case Some(value):
+            assert value == 9 - 2 - 3
+        case None:
+            raise AssertionError
+
+
+def test_left_recursive_rule_memoizes_inner_results_while_seed_grows():
+    calls: list[int] = []
+
+    def sum_rule(cursor: Cursor) -> Option[tuple[int, Cursor]]:
+        calls.append(cursor.offset)
+        return add_to(lift(lambda a: lambda b: a + b)(take_before(text("+"))(summation))(term))(term)(cursor)
+
+    summation = left_recursive(sum_rule)
+    term = add_to(bracket(text("("))(text(")"))(summation))(map_by(int)(digit))
+    depth = 12
+    match parse_as(take_before(end)(summation))("(" * depth + "1+1" + ")" * depth + "+1"):
+        case Some(value):
+            assert value == 1 + 1 + 1
+        case None:
+            raise AssertionError
+    assert len(calls) <= 2 * len(builtins.set(calls)) + 2
+
+
+def test_many_handles_long_repetitions_without_recursion():
+    match parse_as(many(digit))("7" * 10_000):
+        case Some(value):
+            assert value == ["7"] * 10_000
+        case None:
+            raise AssertionError
+
+
+def test_repetitions_stop_when_operand_matches_without_consuming():
+    match (
+        parse_as(many(add_to(digit)(pure(""))))("12x"),
+        parse_as(many(take_while(str.isdigit)))("12x"),
+        parse_as(take_before(end)(many(skip_spaces)))(""),
+        parse_as(some(many(digit)))("12"),
+        parse_as(separated_by(pure(None))(add_to(digit)(pure(""))))("12"),
+        parse_as(many_into(felis.list.monoid)(map_by(lambda _: [])(pure(None))))("1"),
+    ):
+        case Some(options), Some(runs), Some(spaces), Some(groups), Some(separated), Some(folded):
+            assert (options, runs, spaces, groups, separated, folded) == (
+                ["1", "2"],
+                ["12"],
+                [],
+                [["1", "2"]],
+                ["1", "2"],
+                [],
+            )
+        case _:
+            raise AssertionError
+    assert parse_as(some(many(digit)))("x") is None
+
+
+def test_separated_by_collects_separated_values():
+    match parse_as(separated_by(text(","))(digit))("1,2,3,"):
+        case Some(value):
+            assert value == ["1", "2", "3"]
+        case None:
+            raise AssertionError
+
+
+def test_many_into_folds_values_with_monoid():
+    match parse_as(many_into(felis.list.monoid)(map_by(lambda value: [int(value)])(digit)))("123"):
+        case Some(value):
+            assert value == [1, 2, 3]
+        case None:
+            raise AssertionError
+
+
+def test_take_while_1_consumes_a_run_in_one_step():
+    match take_while_1(str.isdigit)(Cursor("x123y", 1)):
+        case Some((value, cursor)):
+            assert (value, cursor.offset) == ("123", 4)
+        case None:
+            raise AssertionError
+
+
+def test_take_while_1_fails_on_empty_run():
+    assert take_while_1(str.isdigit)(Cursor("x", 0)) is None
+
+
+def test_regex_matches_at_cursor_offset():
+    match parse_as(take_after(skip_spaces)(regex(r"[a-z]+")))("  felis catus"):
+        case Some(value):
+            assert value == "felis"
+        case None:
+            raise AssertionError
+
+
+def test_optimize_fuses_regular_grammar_into_one_pattern():
+    identifier = lift(lambda first: lambda rest: first + "".join(rest))(alpha)(many(alnum))
+    optimized = optimize(identifier)
+    match grammar_of(optimized), optimized(Cursor("cat9 dog", 0)):
+        case Some(grammar), Some((value, cursor)):
+            assert (grammar.combinator, value, cursor.offset) == ("fused", "cat9", len("cat9"))
+        case _:
+            raise AssertionError
+
+
+def test_recognize_returns_consumed_text_when_fused_and_compiled(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(felis.parser_compiler, "compile_cache", tmp_path)
+    signed = recognize(take_after(option(one_of("+-")))(some(digit)))
+    parser = take_before(end)(separated_by(text(","))(signed))
+    results = [parse_as(variant)("-12,3,+4") for variant in (parser, optimize(parser), compile(parser))]
+    match grammar_of(optimize(parser)), results:
+        case Some(grammar), [Some(plain), Some(fused), Some(compiled)]:
+            assert (grammar.combinator, plain, fused, compiled) == ("fused", ["-12", "3", "+4"], ["-12", "3", "+4"], ["-12", "3", "+4"])
+        case _:
+            raise AssertionError
+
+
+def test_optimize_keeps_some_failing_when_operand_matches_empty(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(felis.parser_compiler, "compile_cache", tmp_path)
+    parser = some(take_while(str.isdigit))
+    assert [parse_as(variant)("x") for variant in (parser, optimize(parser), compile(parser))] == [None, None, None]
+    match [parse_as(variant)("12x") for variant in (parser, optimize(parser), compile(parser))]:
+        case [Some(["12"]), Some(["12"]), Some(["12"])]:
+            pass
+        case _:
+            raise AssertionError
+
+
+def test_optimize_keeps_ordered_choice_semantics():
+    parser = take_before(text("c"))(add_to(text("a"))(text("ab")))
+    assert optimize(parser)(Cursor("abc", 0)) is None
+
+
+def test_parse_stream_yields_records_split_across_chunks():
+    pulled: list[str] = []
+
+    def chunks() -> Iterator[str]:
+        for chunk in ["12", "3\n4", "5\n", "6\n"]:
+            pulled.append(chunk)
+            yield chunk
+
+    records = parse_stream(take_before(character("\n"))(map_by(int)(take_while_1(str.isdigit))))(chunks())
+    assert (next(records), pulled) == (123, ["12", "3\n4"])
+    assert list(records) == [45, 6]
+
+
+def test_parse_stream_yields_regex_record_with_declared_lookahead_before_pulling_next_chunk():
+    pulled: list[str] = []
+
+    def chunks() -> Iterator[str]:
+        for chunk in ["ab\n", "cd\n", "ef\n"]:
+            pulled.append(chunk)
+            yield chunk
+
+    for record in (take_before(character("\n"))(regex("[a-z]*", 1)), optimize(take_before(character("\n"))(regex("[a-z]*", 1)))):
+        pulled.clear()
+        records = parse_stream(record)(chunks())
+        assert (next(records), pulled) == ("ab", ["ab\n"])
+        assert list(records) == ["cd", "ef"]
+
+
+def test_parse_stream_retries_long_record_a_logarithmic_number_of_times():
+    record = take_before(character("\n"))(take_while_1(str.isdigit))
+    attempts = 0
+
+    def counted(cursor: Cursor) -> Option[tuple[str, Cursor]]:
+        nonlocal attempts
+        attempts += 1
+        return record(cursor)
+
+    assert list(parse_stream(counted)(iter("1" * 4096 + "\n"))) == ["1" * 4096]
+    assert attempts < 2 * (4096).bit_length()
+
+
+def test_parse_stream_yields_record_before_pulling_next_chunk():
+    pulled: list[str] = []
+
+    def chunks() -> Iterator[str]:
+        for chunk in ["1\n", "2\n", "3\n"]:
+            pulled.append(chunk)
+            yield chunk
+
+    records = parse_stream(take_before(character("\n"))(map_by(int)(take_while_1(str.isdigit))))(chunks())
+    assert (next(records), pulled) == (1, ["1\n"])
+    assert list(records) == [2, 3]
+
+
+def test_parse_stream_waits_for_more_input_before_choosing_alternative():
+    assert list(parse_stream(add_to(text("abc"))(text("a")))(["ab", "c", "a"])) == ["abc", "a"]
+
+
+def test_parse_stream_waits_for_more_input_after_successful_match():
+    assert list(parse_stream(take_before(text(";"))(regex("abc|a")))(["ab", "c;", "a;"])) == ["abc", "a"]
+
+
+def test_parse_stream_rejects_malformed_record():
+    records = parse_stream(take_before(character("\n"))(map_by(int)(take_while_1(str.isdigit))))(["1\n", "x\n2\n"])
+    assert next(records) == 1
+    with pytest.raises(ValueError, match="offset 2"):
+        next(records)
+
+
+def test_commit_prevents_trying_remaining_alternatives():
+    keyword = take_after(commit(text("let")))(text(" x"))
+    assert parse_as(add_to(keyword)(text("let")))("let") is None
+    assert parse_as(add_to(text("let"))(keyword))("let") is not None
+
+
+def test_commit_only_affects_innermost_choice():
+    committed = add_to(take_after(commit(text("a")))(text("c")))(text("ab"))
+    assert parse_as(committed)("ab") is None
+    match parse_as(add_to(committed)(text("ab")))("ab"):
+        case Some(value):
+            assert value == "ab"
+        case None:
+            raise AssertionError
+
+
+def test_parse_as_either_reports_furthest_failure():
+    match parse_as_either(take_before(end)(separated_by(text(","))(digit)))("1,2\n3,4,x"):
+        case Left(cursor):
+            assert (cursor.offset, line(cursor), column(cursor)) == (len("1,2"), 1, len("1,2") + 1)
+        case _:
+            raise AssertionError
+
+
+def test_precedence_respects_binding_powers_and_associativity():
+    def operator[T](symbol: str, function: T) -> Parser[T]:
+        return take_after(text(symbol))(pure(function))
+
+    operators = Operators(
+        prefix=[(operator("-", lambda value: -value), 2)],
+        infix_left=[(operator("-", lambda right: lambda left: left - right), 1)],
+        infix_right=[(operator("^", lambda right: lambda left: left**right), 3)],
+    )
+    match parse_as(take_before(end)(precedence(operators)(map_by(int)(digit))))("-2^3^2-1-1"):
+        case Some(value):
+            assert value == -(2 ** (3**2)) - 1 - 1
+        case None:
+            raise AssertionError
+
+
+def test_precedence_handles_long_chains_without_recursion():
+    operators = Operators(infix_left=[(take_after(text("+"))(pure(lambda right: lambda left: left + right)), 1)])
+    operands = "1" * 10_000
+    match parse_as(precedence(operators)(map_by(int)(digit)))("+".join(operands)):
+        case Some(value):
+            assert value == len(operands)
+        case None:
+            raise AssertionError
+
+
+def test_optimize_predicts_alternative_from_next_character():
+    def keyword(word: str) -> Parser[str]:
+        return to_bind(text(word))(pure)
+
+    optimized = optimize(add_to(keyword("if"))(add_to(keyword("else"))(keyword("end"))))
+    match grammar_of(optimized), parse_as(optimized)("end"):
+        case Some(grammar), Some(value):
+            assert (grammar.combinator, value) == ("predicted", "end")
+        case _:
+            raise AssertionError
+
+
+def test_optimize_predicts_separated_elements_that_may_be_empty():
+    grammar = add_to(take_before(text("!"))(separated_by(text(";"))(many(to_bind(text("a"))(pure)))))(text("x"))
+    match parse_as(grammar)(";a!"), parse_as(optimize(grammar))(";a!"):
+        case Some(value), Some(optimized_value):
+            assert value == optimized_value == [[], ["a"]]
+        case _:
+            raise AssertionError
+
+
+def test_parse_file_decodes_records_across_chunk_boundaries(tmp_path: Path):
+    path = tmp_path / "records.txt"
+    records = [f"{index}é" for index in range(20_000)]
+    path.write_text("".join(f"{record}\n" for record in records), encoding="utf-8")
+    assert list(parse_file(take_before(character("\n"))(take_while_1(lambda current: current != "\n")))(path)) == records
+
+
+def test_parse_parallel_returns_records_in_order(tmp_path: Path):
+    path = tmp_path / "records.txt"
+    numbers = list(range(5_000))
+    path.write_text("".join(f"{number};" for number in numbers), encoding="utf-8")
+    parsed = parse_parallel(2)(";")(take_before(end)(map_by(int)(take_while_1(str.isdigit))))(path)
+    assert [value.value if isinstance(value, Some) else None for value in parsed] == numbers
+
+
+def test_parse_parallel_splits_overlapping_separators_like_sequential_scan(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    path = tmp_path / "records.txt"
+    text_of_records = "".join(f"{number}" + ";" * (number % 3 + 2) for number in range(200)) + "end;;"
+    path.write_text(text_of_records, encoding="utf-8")
+    expected = text_of_records.split(";;")[:-1]
+    record = take_before(end)(take_while(lambda current: current != "\n"))
+    for start_methods in (["fork"], ["spawn"]):
+        monkeypatch.setattr(felis.parser_stream.multiprocessing, "get_all_start_methods", lambda start_methods=start_methods: start_methods)
+        parsed = parse_parallel(3)(";;")(record)(path)
+        assert [value.value if isinstance(value, Some) else None for value in parsed] == expected
+
+
+def test_profiling_records_named_rule_statistics():
+    assignment = named("assignment")(take_after(text("let "))(text("x")))
+    word = named("word")(take_while_1(str.isalpha))
+    with profiling() as profile:
+        assert parse_as(many(take_before(skip_spaces)(add_to(assignment)(word))))("let y") is not None
+    rule = profile.rules["assignment"]
+    assert (rule.calls, rule.successes, rule.failures, rule.discarded) == (3, 0, 3, len("let "))
+    assert report(profile).splitlines()[0].split() == ["rule", "calls", "successes", "failures", "seconds", "discarded"]
+
+
+def test_profiling_charges_named_successes_discarded_by_failed_alternative(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(felis.parser_compiler, "compile_cache", tmp_path)
+    word = named("word")(take_while_1(str.isalpha))
+    parser = add_to(take_before(text("!"))(word))(take_before(text("?"))(word))
+    for variant in (parser, optimize(parser), compile(parser)):
+        with profiling() as profile:
+            assert parse_as(variant)("abcdef?") is not None
+        rule = profile.rules["word"]
+        assert (rule.successes, rule.discarded) == (2, len("abcdef"))
+
+
+def test_commit_releases_memo_entries_before_cut():
+    string = ";1" * 100
+    memo = Memo(string, 1 << 8)
+    assert incremental_parse_as(many(take_after(commit(text(";")))(memoize(digit))))(memo) is not None
+    assert ([start for _, start in memo.results], list(memo.offsets)) == ([len(string) - 1], [len(string) - 1])
+
+
+def test_parse_reader_yields_message_without_waiting_for_more_input():
+    async def message() -> Option[int]:
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"12\n")
+        return await asyncio.wait_for(parse_reader(take_before(character("\n"))(map_by(int)(take_while_1(str.isdigit))))(reader)(), 1)
+
+    match asyncio.run(message()):
+        case Some(12):
+            pass
+        case _:
+            raise AssertionError
+
+
+def test_parse_reader_yields_messages_before_stream_ends():
+    async def messages() -> list[Option[int]]:
+        reader = asyncio.StreamReader()
+        next_message = parse_reader(take_before(character("\n"))(map_by(int)(take_while_1(str.isdigit))))(reader)
+        reader.feed_data(b"12\n3")
+        first = await next_message()
+        reader.feed_data(b"4\n")
+        second = await next_message()
+        reader.feed_eof()
+        return [first, second, await next_message()]
+
+    match asyncio.run(messages()):
+        case [Some(first), Some(second), None]:
+            assert (first, second) == (12, 34)
+        case _:
+            raise AssertionError
+
+
+def test_parse_reader_iterates_messages_with_async_for():
+    async def messages() -> list[int]:
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"12\n34\n")
+        reader.feed_eof()
+        return [message async for message in parse_reader(take_before(character("\n"))(map_by(int)(take_while_1(str.isdigit))))(reader)]
+
+    assert asyncio.run(messages()) == [12, 34]
+
+
+def test_one_of_texts_matches_longest_literal():
+    keywords = one_of_texts(["se", "select", "set", "self"])
+    fused = optimize(some(keywords))
+    match many(take_before(skip_spaces)(keywords))(Cursor("selection self sets", 0)), grammar_of(fused), fused(Cursor("selfsetse", 0)):
+        case Some((values, _)), Some(grammar), Some((fused_values, _)):
+            assert (values, grammar.combinator, fused_values) == (["select"], "fused", ["self", "set", "se"])
+        case _:
+            raise AssertionError
+
+
+def test_cached_parse_as_reuses_results_within_budget():
+    cache = ParseCache(1 << 12)
+    parse = cached_parse_as(cache)(some(digit))
+    assert [parse(string) is not None for string in ["12", "12", "x", "12", "x" * (1 << 12)]] == [True, True, False, True, False]
+    assert (cache.hits, cache.misses, hit_rate(cache), len(cache.results)) == (2, 3, 2 / 5, 2)
+
+
+def test_cached_parse_as_charges_nested_values_and_returns_copies():
+    cache = ParseCache(1 << 12)
+    parse = cached_parse_as(cache)(many(some(digit)))
+    match parse("1" * 8):
+        case Some(value):
+            value[0].clear()
+        case None:
+            raise AssertionError
+    match parse("1" * 8), parse("1" * 1024):
+        case Some([["1", "1", "1", "1", "1", "1", "1", "1"]]), Some(_):
+            assert len(cache.results) == 1
+        case _:
+            raise AssertionError
+
+
+def test_incremental_parse_reuses_results_outside_edit():
+    calls: list[int] = []
+
+    def counted(cursor: Cursor) -> Option[tuple[int, Cursor]]:
+        calls.append(cursor.offset)
+        return map_by(int)(take_while_1(str.isdigit))(cursor)
+
+    numbers = take_before(end)(separated_by(text(","))(memoize(counted)))
+    memo = Memo("1,22,333", 1 << 4)
+    assert incremental_parse_as(numbers)(memo) is not None
+    calls.clear()
+    match incremental_parse_as(numbers)(edited(Edit(2, 2, "4"))(memo)):
+        case Some(value):
+            assert (value, calls) == ([1, 4, 333], [2])
+        case None:
+            raise AssertionError
+
+
+def test_incremental_parse_reparses_pattern_whose_alternatives_read_past_match():
+    tokens = many(memoize(regex("abc|a")))
+    memo = Memo("abx", 1 << 4)
+    assert incremental_parse_as(tokens)(memo) is not None
+    for parser in (tokens, optimize(tokens)):
+        match incremental_parse_as(parser)(edited(Edit(2, 1, "c"))(memo)):
+            case Some(value):
+                assert value == ["abc"]
+            case None:
+                raise AssertionError
+
+
+def test_fix_ties_recursive_grammar_that_optimize_follows():
+    nested = fix(lambda nested: add_to(map_by(lambda depth: depth + 1)(bracket(text("["))(text("]"))(nested)))(pure(0)))
+    optimized = optimize(nested)
+    match parse_as(nested)("[[[]]]"), parse_as(optimized)("[[[]]]"), grammar_of(optimized):
+        case Some(value), Some(optimized_value), Some(grammar):
+            assert (value, optimized_value, grammar.combinator) == (3, 3, "ref")
+        case _:
+            raise AssertionError
+
+
+def test_optimize_predicts_chain_whose_operand_may_be_empty():
+    joined = chain_left_1(take_after(text(","))(pure(lambda right: lambda left: left + right)))(many(to_bind(text("a"))(pure)))
+    grammar = add_to(take_before(text("!"))(joined))(text("x"))
+    match parse_as(grammar)(",a!"), parse_as(optimize(grammar))(",a!"):
+        case Some(value), Some(optimized_value):
+            assert value == optimized_value == ["a"]
+        case _:
+            raise AssertionError
+
+
+def test_define_binds_forward_reference_without_keeping_it_alive():
+    expression: Parser[int] = ref()
+    term = add_to(bracket(text("("))(text(")"))(expression))(map_by(int)(digit))
+    define(expression)(chain_left_1(take_after(text("+"))(pure(lambda right: lambda left: left + right)))(term))
+    match parse_as(take_before(end)(expression))("1+(2+3)+4"):
+        case Some(value):
+            assert value == 1 + (2 + 3) + 4
+        case None:
+            raise AssertionError
+    released = weakref.ref(expression)
+    del expression, term
+    gc.collect()
+    assert released() is None
+
+
+def test_plain_parser_functions_compose_with_combinators():
+    def negative(cursor: Cursor) -> Option[tuple[int, Cursor]]:
+        return map_by(lambda digits: -int(digits))(take_after(text("-"))(take_while_1(str.isdigit)))(cursor)
+
+    numbers = separated_by(text(","))(add_to(negative)(map_by(int)(take_while_1(str.isdigit))))
+    match parse_as(numbers)("1,-2,3"), numbers(Cursor("-4,5", 0)):
+        case Some(value), Some((direct, cursor)):
+            assert (value, direct, cursor.offset) == ([1, -2, 3], [-4, 5], len("-4,5"))
+        case _:
+            raise AssertionError
+
+
+def test_compile_generates_cached_module_that_parses_like_grammar(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(felis.parser_compiler, "compile_cache", tmp_path)
+    number = map_by(int)(take_while_1(str.isdigit))
+    sum_of = chain_left_1(take_after(text("+"))(pure(lambda right: lambda left: left + right)))(number)
+    lines = take_before(end)(separated_by(text("\n"))(add_to(sum_of)(map_by(lambda _: 0)(text("-")))))
+    compiled = compile(lines)
+    assert compile(lines) is compiled
+    assert len(list(tmp_path.glob("felis_*.py"))) == 1
+    match parse_as(compiled)("1+2\n-\n30+4+5"), parse_as_either(compiled)("1+2\n3+"):
+        case Some(value), Left(cursor):
+            assert (value, cursor.offset) == ([3, 0, 39], len("1+2\n3+"))
+        case _:
+            raise AssertionError
+
+
+def test_compile_keeps_commit_and_memoize_semantics(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(felis.parser_compiler, "compile_cache", tmp_path)
+    keyword = add_to(take_after(commit(text("le")))(text("t")))(text("lex"))
+    compiled = compile(add_to(keyword)(memoize(map_by(str.upper)(take_while_1(str.isalpha)))))
+    match parse_as(compiled)("let"), parse_as(compiled)("lex"), parse_as(compiled)("ape"):
+        case Some(committed), Some(abandoned), Some(word):
+            assert (committed, abandoned, word) == ("t", "LEX", "APE")
+        case _:
+            raise AssertionError
+
+
+def test_compile_stops_repetitions_that_do_not_consume(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(felis.parser_compiler, "compile_cache", tmp_path)
+    compiled = compile(
+        lift(lambda runs: lambda total: (runs, total))(many(take_while(str.isdigit)))(chain_left_1(pure(lambda _: lambda left: left))(take_while(str.isdigit)))
+    )
+    match parse_as(compiled)("12"):
+        case Some(value):
+            assert value == (["12"], "")
+        case None:
+            raise AssertionError
+
+
+def test_load_grammar_reuses_artifacts_saved_by_another_build(tmp_path: Path):
+    def grammar() -> Parser[list[str]]:
+        word = to_bind(alpha)(lambda first: map_by(lambda rest: first + "".join(rest))(many(alnum)))
+        return separated_by(text(","))(add_to(word)(add_to(map_by(str)(digit))(text("-"))))
+
+    path = tmp_path / "grammar.json"
+    built = optimize(grammar())
+    assert parse_as(built)("ab1,2,-") is not None
+    save_grammar(path)(built)
+    artifacts = json.loads(path.read_text(encoding="utf-8"))
+    match parse_as(load_grammar(path)(grammar()))("ab1,2,-,c"), parse_as(load_grammar(path)(text("x")))("x"):
+        case Some(value), Some(unrelated):
+            assert (value, unrelated, builtins.any(artifacts["tables"].values())) == (["ab1", "2", "-", "c"], "x", True)
+        case _:
+            raise AssertionError
+    assert parse_as(load_grammar(tmp_path / "missing.json")(grammar()))("a") is not None
+
+
+def test_load_grammar_rejects_tables_saved_for_different_closures(tmp_path: Path):
+    def grammar(letters: str) -> Parser[str]:
+        return add_to(map_by(str.upper)(satisfies(lambda current: current in letters)))(text("-"))
+
+    path = tmp_path / "grammar.json"
+    built = optimize(grammar("a"))
+    assert parse_as(built)("b") is None
+    save_grammar(path)(built)
+    match parse_as(load_grammar(path)(grammar("ab")))("b"):
+        case Some(value):
+            assert value == "B"
+        case None:
+            raise AssertionError
+
+
+def test_load_grammar_skips_tables_for_operands_it_cannot_fingerprint(tmp_path: Path):
+    def grammar(letters: str) -> Parser[str]:
+        return add_to(map_by(str.upper)(satisfies(partial(operator.contains, letters))))(text("-"))
+
+    path = tmp_path / "grammar.json"
+    built = optimize(grammar("a"))
+    assert parse_as(built)("b") is None
+    save_grammar(path)(built)
+    match parse_as(load_grammar(path)(grammar("ab")))("b"):
+        case Some(value):
+            assert value == "B"
+        case None:
+            raise AssertionError
+
+
+def test_find_all_returns_non_overlapping_matches_like_finditer():
+    number = map_by(int)(take_while_1(str.isdigit))
+    text_with_numbers = "order 66 shipped 3 crates, 120 left"
+    matches = [(match.value, match.start, match.end) for match in find_all(number)(text_with_numbers)]
+    assert matches == [(int(found.group()), found.start(), found.end()) for found in re.finditer(r"\d+", text_with_numbers)]
+
+
+def test_find_all_prefilter_keeps_matches_that_start_inside_a_chain():
+    joined = chain_left_1(take_after(text(","))(pure(lambda right: lambda left: left + right)))(many(text("a")))
+    assert [(match.value, match.start, match.end) for match in find_all(take_before(text("!"))(joined))("b,a!")] == [(["a"], 1, 4)]
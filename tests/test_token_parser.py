@@ -0,0 +1,60 @@
+from felis.option import Some
+from felis.token_parser import end, kind, lexer, literal, many, map_by, option, parse_as, separated_by, take_after, take_before
+
+tokenize = lexer(["space"])([("number", r"\d+"), ("name", r"[a-z]+"), ("comma", ","), ("space", r"\s+")])
+
+
+def test_lexer_skips_ignored_kinds():
+    match tokenize("ab 12,c"):
+        case Some(tokens):
+            assert ([tokens.names[kind] for kind in tokens.kinds], list(tokens.starts), list(tokens.ends)) == (
+                ["name", "number", "comma", "name"],
+                [0, 3, 5, 6],
+                [2, 5, 6, 7],
+            )
+        case None:
+            raise AssertionError
+
+
+def test_lexer_fails_on_unmatched_input():
+    assert tokenize("ab ?") is None
+
+
+def test_parser_runs_over_token_indices():
+    numbers = take_before(end)(take_after(literal("sum"))(separated_by(kind("comma"))(map_by(lambda token: int(token.text))(kind("number")))))
+    match tokenize("sum 1, 2,3"):
+        case Some(tokens):
+            match parse_as(numbers)(tokens):
+                case Some(value):
+                    assert value == [1, 2, 3]
+                case None:
+                    raise AssertionError
+        case None:
+            raise AssertionError
+
+
+def test_repetitions_stop_when_operand_matches_without_consuming():
+    numbers = separated_by(option(kind("comma")))(many(kind("number")))
+    match tokenize("1 2,c"):
+        case Some(tokens):
+            match parse_as(numbers)(tokens):
+                case Some(value):
+                    assert [[token.text for token in group] for group in value] == [["1", "2"], []]
+                case None:
+                    raise AssertionError
+        case None:
+            raise AssertionError
+
+
+def test_kind_resolves_its_index_for_each_lexer():
+    names = many(map_by(lambda token: token.text)(kind("name")))
+    reordered = lexer(["space"])([("space", r"\s+"), ("name", r"[a-z]+"), ("number", r"\d+")])
+    match tokenize("ab c"), reordered("ab c"), reordered("12"):
+        case Some(tokens), Some(other), Some(numbers):
+            match parse_as(names)(tokens), parse_as(names)(other), parse_as(names)(numbers):
+                case Some(["ab", "c"]), Some(["ab", "c"]), Some([]):
+                    pass
+                case _:
+                    raise AssertionError
+        case _:
+            raise AssertionError